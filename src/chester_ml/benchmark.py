@@ -0,0 +1,253 @@
+import csv
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from loguru import logger
+from chester_ml.utils.stats import summarize
+
+BENCH_PROVIDERS = ("files", "sqlite")
+BENCH_FORMATS = ("json", "ndjson", "npy")
+CATEGORIES = ("alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta")
+DEFAULT_TOLERANCE = 0.10
+
+
+def _records(rows, seed):
+    generator = random.Random(seed)
+    for i in range(rows):
+        yield {
+            "id": i,
+            "name": f"user_{i % 1000}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "amount": round(generator.uniform(0, 10000), 2),
+            "active": generator.random() < 0.5,
+            "created": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00:00"
+        }
+
+
+def generate_datasets(directory, rows, seed=0):
+    """
+    Genera los datos sintéticos del benchmark en `directory`: data.json,
+    data.csv, data.ndjson, una base SQLite bench.db (tabla records) y el
+    universo local que los declara. Devuelve los bytes de origen por proveedor.
+    """
+    os.makedirs(os.path.join(directory, "universes"), exist_ok=True)
+    paths = {name: os.path.join(directory, name) for name in ("data.json", "data.csv", "data.ndjson", "bench.db")}
+    fields = list(next(_records(1, seed)))
+
+    with open(paths["data.json"], "w", encoding="utf-8") as json_file, \
+            open(paths["data.ndjson"], "w", encoding="utf-8") as ndjson_file, \
+            open(paths["data.csv"], "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=fields)
+        writer.writeheader()
+        json_file.write("[")
+        for i, record in enumerate(_records(rows, seed)):
+            line = json.dumps(record)
+            json_file.write(f",\n{line}" if i else f"\n{line}")
+            ndjson_file.write(line + "\n")
+            writer.writerow(record)
+        json_file.write("\n]\n")
+
+    if os.path.exists(paths["bench.db"]):
+        os.remove(paths["bench.db"])
+    connection = sqlite3.connect(paths["bench.db"])
+    try:
+        connection.execute(
+            "CREATE TABLE records (id INTEGER PRIMARY KEY, name TEXT, category TEXT, "
+            "amount REAL, active INTEGER, created TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO records VALUES (:id, :name, :category, :amount, :active, :created)",
+            _records(rows, seed)
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+    universe = {
+        "FILES": {
+            "json": {"path": paths["data.json"]},
+            "csv": {"path": paths["data.csv"], "stream": True},
+            "ndjson": {"path": paths["data.ndjson"], "stream": True}
+        },
+        "SQLITE": {
+            "records": {"path": paths["bench.db"], "query": "SELECT * FROM records", "stream": True}
+        }
+    }
+    with open(os.path.join(directory, "universes", "local.json"), "w", encoding="utf-8") as file:
+        json.dump(universe, file, indent=4)
+
+    return {
+        "files": {
+            "bytes": sum(os.path.getsize(paths[name]) for name in ("data.json", "data.csv", "data.ndjson")),
+            "rows": rows * len(universe["FILES"])
+        },
+        "sqlite": {"bytes": os.path.getsize(paths["bench.db"]), "rows": rows}
+    }
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _output_rows(output, output_format):
+    """Filas que contiene la salida de una ejecución (json, ndjson o npy)."""
+    if output_format == "json":
+        if not os.path.exists(output):
+            return 0
+        with open(output, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        return sum(len(rows) if isinstance(rows, list) else 1
+                   for statements in data.values() for rows in statements.values())
+
+    total = 0
+    for root, _, files in os.walk(output):
+        for name in files:
+            path = os.path.join(root, name)
+            if output_format == "npy" and name == "schema.json":
+                with open(path, "r", encoding="utf-8") as file:
+                    total += json.load(file)["rows"]
+            elif output_format == "ndjson" and name.endswith(".ndjson"):
+                with open(path, "r", encoding="utf-8") as file:
+                    total += sum(1 for line in file if line.strip())
+    return total
+
+
+def _run_case(directory, provider, output_format, repeat, warmup, expected_rows):
+    """
+    Ejecuta un caso en un proceso hijo para medir su pico de RSS por separado.
+    Falla si alguna ejecución no escribe las `expected_rows` filas de origen.
+    """
+    os.environ["CHESTER_PROGRESS"] = "0"
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    from chester_ml.core import execute_providers
+
+    output = os.path.join(directory, f"out_{provider}_{output_format}")
+    if output_format == "json":
+        output += ".json"
+    universe_dir = os.path.join(directory, "universes")
+
+    timings = []
+    for run in range(warmup + repeat):
+        start = time.perf_counter()
+        execute_providers([provider], output, output_format=output_format,
+                          use_cache=False, universe_dir=universe_dir)
+        elapsed = time.perf_counter() - start
+        rows = _output_rows(output, output_format)
+        if rows != expected_rows:
+            raise RuntimeError(f"run {run + 1} wrote {rows:,} of {expected_rows:,} rows")
+        if run >= warmup:
+            timings.append(elapsed)
+        if os.path.isdir(output):
+            shutil.rmtree(output)
+        elif os.path.exists(output):
+            os.remove(output)
+
+    return {"timings": timings, "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_benchmark(rows=100_000, repeat=3, providers=BENCH_PROVIDERS, formats=BENCH_FORMATS,
+                  directory=None, warmup=1, seed=0):
+    """
+    Genera los datos sintéticos y ejecuta cada combinación proveedor × formato
+    de salida de punta a punta con execute_providers, `repeat` veces tras
+    `warmup` ejecuciones descartadas. Cada caso corre en un proceso nuevo
+    para que el pico de RSS sea el suyo.
+
+    Devuelve un informe JSON-serializable con filas/s, MB/s, percentiles de
+    latencia por ejecución y pico de RSS de cada caso. Un caso cuya salida no
+    tiene todas las filas de origen se marca con "error" y sin tiempos.
+    """
+    keep = directory is not None
+    directory = directory or tempfile.mkdtemp(prefix="chester_bench_")
+    context = multiprocessing.get_context("spawn")
+
+    try:
+        logger.info(f"🧪 Generating {rows:,} synthetic rows in {directory}...")
+        sources = generate_datasets(directory, rows, seed)
+
+        cases = []
+        for provider in providers:
+            for output_format in formats:
+                logger.info(f"⏱️ Benchmarking {provider} → {output_format} ({repeat} runs)...")
+                source = sources[provider]
+                try:
+                    with context.Pool(1) as pool:
+                        result = pool.apply(_run_case, (directory, provider, output_format, repeat, warmup,
+                                                        source["rows"]))
+                except Exception as e:
+                    logger.error(f"❌ Benchmark case {provider} → {output_format} failed: {e}")
+                    cases.append({"provider": provider, "format": output_format, "rows": source["rows"],
+                                  "bytes": source["bytes"], "error": str(e)})
+                    continue
+
+                best = min(result["timings"])
+                cases.append({
+                    "provider": provider,
+                    "format": output_format,
+                    "rows": source["rows"],
+                    "bytes": source["bytes"],
+                    "rows_per_s": round(source["rows"] / best, 1),
+                    "mb_per_s": round(source["bytes"] / (1024 * 1024) / best, 2),
+                    "latency_s": summarize(result["timings"]),
+                    "peak_rss_mb": result["peak_rss_mb"]
+                })
+    finally:
+        if not keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "rows": rows,
+        "repeat": repeat,
+        "cases": cases
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara el rendimiento (filas/s) de cada caso contra un informe previo y
+    devuelve los que empeoraron más que `tolerance` (0.10 = 10 %).
+    """
+    previous = {(case["provider"], case["format"]): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in report["cases"]:
+        before = previous.get((case["provider"], case["format"]))
+        if "error" in case or not before or not before.get("rows_per_s"):
+            continue
+        change = case["rows_per_s"] / before["rows_per_s"] - 1
+        case["vs_baseline"] = round(change, 4)
+        if change < -tolerance:
+            regressions.append(case)
+    return regressions
+
+
+def log_report(report):
+    logger.info("───────────────────────────────")
+    for case in report["cases"]:
+        if "error" in case:
+            logger.info(f"📊 {case['provider']:>7} → {case['format']:<6} failed: {case['error']}")
+            continue
+        latency = case["latency_s"]
+        line = (f"📊 {case['provider']:>7} → {case['format']:<6} "
+                f"{case['rows_per_s']:>12,.0f} rows/s {case['mb_per_s']:>8.2f} MB/s "
+                f"p50 {latency['p50']:.3f}s p90 {latency['p90']:.3f}s "
+                f"peak RSS {case['peak_rss_mb']} MB")
+        if "vs_baseline" in case:
+            line += f" ({case['vs_baseline']:+.1%} vs baseline)"
+        logger.info(line)
+    logger.info("───────────────────────────────")
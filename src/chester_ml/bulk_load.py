@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from collections.abc import Iterator
+from loguru import logger
+from dotenv import load_dotenv
+from chester_ml.providers.file_providers import DEFAULT_CHUNK_SIZE, FileProvider
+from chester_ml.utils import progress
+from chester_ml.utils.progress import ProgressReporter
+
+LOAD_TARGETS = ("sql", "sqlite", "mongo")
+
+
+def file_batches(path, chunk_size=DEFAULT_CHUNK_SIZE, select=None):
+    """
+    Lotes de registros de un archivo (json, ndjson, csv o txt), p. ej. una
+    salida de `chester run`. La salida ndjson ya tiene un archivo por
+    statement; de la salida json ({proveedor: {statement: filas}}) se carga
+    el statement `select` ("proveedor.nombre").
+    """
+    provider = FileProvider(path)
+    if not provider.test_connection():
+        raise FileNotFoundError(f"Source file not readable: {path}")
+    if provider.format != "json":
+        if select:
+            raise ValueError("--select only applies to the json output of chester run")
+        return provider.read_batches(chunk_size)
+
+    with open(path, "r", encoding=provider.encoding) as file:
+        data = json.load(file)
+    statements = _run_output(data)
+    if select:
+        if statements is None:
+            raise ValueError(f"{path} is not a chester run output; --select does not apply")
+        provider_name, _, name = select.partition(".")
+        label = f"{provider_name.upper()}.{name}"
+        if label not in statements:
+            raise KeyError(f"Statement '{label}' not in {path}. Available: {', '.join(statements)}")
+        data = statements[label]
+    elif statements is not None:
+        raise ValueError(f"{path} is a chester run output; choose a statement with --select ({', '.join(statements)})")
+
+    records = data if isinstance(data, list) else [data]
+    return (records[start:start + chunk_size] for start in range(0, len(records), chunk_size))
+
+
+def _run_output(data):
+    """{"PROVEEDOR.nombre": resultado} si `data` tiene la forma de una salida json de `chester run`, o None."""
+    if not isinstance(data, dict) or not data:
+        return None
+    if not all(isinstance(key, str) and key.isupper() and isinstance(value, dict) for key, value in data.items()):
+        return None
+    return {f"{provider}.{name}": result for provider, statements in data.items() for name, result in statements.items()}
+
+
+def statement_batches(label, universe_dir="universes"):
+    """
+    Ejecuta el statement "proveedor.nombre" (p. ej. sql.orders) forzando
+    "stream": true y devuelve sus lotes, para cargarlo sin archivo intermedio.
+    """
+    from chester_ml.providers.registry import get_provider
+    from chester_ml.utils.statements_loader import StatementsLoader
+
+    provider_name, _, name = label.partition(".")
+    spec = get_provider(provider_name)
+    loader = StatementsLoader(universe_dir)
+    loader.load_statements()
+    statement = loader.get_statement(spec.context, spec.section, name)
+    if not statement:
+        raise KeyError(f"Statement '{label}' not found.")
+
+    result = spec.load_engine()().execute(spec.section, {**statement, "stream": True})
+    if result is None:
+        raise RuntimeError(f"Statement '{label}' returned no results.")
+    return result if isinstance(result, Iterator) else [result]
+
+
+def _target_controller(target, database=None, collection=None):
+    load_dotenv()
+    if target == "sql":
+        from chester_ml.providers.database_providers.sql_controller import SQLController
+        return SQLController(
+            host=os.getenv("SQL_HOST"),
+            user=os.getenv("SQL_USER"),
+            password=os.getenv("SQL_PASSWORD"),
+            database=database or os.getenv("SQL_DATABASE")
+        )
+    if target == "sqlite":
+        from chester_ml.providers.database_providers.sqlite_controller import SQLiteController
+        if not database:
+            raise ValueError("The sqlite target needs --database PATH.")
+        return SQLiteController(database)
+    if target == "mongo":
+        from chester_ml.providers.database_providers.mongo_controller import MongoController
+        return MongoController(
+            uri=os.getenv("MONGO_URI"),
+            database=database or os.getenv("MONGO_DATABASE"),
+            collection=collection
+        )
+    raise ValueError(f"Unsupported load target '{target}'. Use one of: {', '.join(LOAD_TARGETS)}")
+
+
+def load_records(batches, target, table, batch_size=None, mode="insert", key=None, database=None):
+    """
+    Carga los lotes `batches` en una tabla SQL/SQLite (executemany con commit
+    por lote) o en una colección Mongo (insert_many/bulk_write desordenados).
+
+    mode ("insert", "ignore", "upsert") aplica a SQL; en Mongo, `key` activa
+    upserts por ese campo. Devuelve el número de filas escritas.
+    """
+    controller = _target_controller(target, database, table)
+    options = {"batch_size": batch_size} if batch_size else {}
+    if target == "mongo":
+        if key:
+            options["key"] = key
+    else:
+        options["mode"] = mode
+
+    logger.info(f"📥 Loading into {target} → {table}...")
+    start = time.perf_counter()
+    with ProgressReporter() as reporter:
+        counter = reporter.track(f"{target}.{table}")
+        progress.bind(counter)
+        try:
+            controller.connect()
+            if target == "mongo":
+                written = controller.write_batches(batches, **options)
+            else:
+                written = controller.write_batches(table, batches, **options)
+        finally:
+            counter.finish()
+            progress.bind(None)
+            controller.close()
+            if hasattr(batches, "close"):
+                batches.close()
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed else 0
+    logger.success(f"✅ Loaded {written:,} rows into {table} in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return written
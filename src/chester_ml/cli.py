@@ -3,11 +3,9 @@ import os
 from loguru import logger
 from dotenv import load_dotenv
 
-from chester_ml.utils.logger_controller import log_mode, dynamic_log
-from chester_ml.core import execute_providers
+from chester_ml.utils.logger_controller import log_mode
 from chester_ml.utils.env_controller import check_env
-from chester_ml.providers.database_providers.sql_controller import SQLController
-from chester_ml.providers.database_providers.mongo_controller import MongoController
+from chester_ml.providers import registry
 
 
 def setup_logger():
@@ -18,69 +16,176 @@ def setup_logger():
     log_mode(logger_level)
 
 
-def check_status():
-    """Verifica la carga del .env y el estado real de las conexiones SQL y Mongo (estilo dinámico tipo Poetry)."""
+def check_status(samples=1, deadline=None, watch=False, interval=5.0):
+    """
+    Verifica la carga del .env y sondea en paralelo los proveedores
+    configurados (SQL, Mongo y rutas de los statements locales) bajo un único
+    plazo total. Con samples > 1 repite conexión + ping y reporta percentiles
+    de latencia; con watch repite la ronda cada `interval` segundos.
+    """
+    import time
+    from chester_ml.health import DEFAULT_DEADLINE, configured_targets, log_reports, run_probes
+    from chester_ml.utils.statements_loader import StatementsLoader
+
     logger.info("🔍 Checking Chester environment and connections...")
     check_env()
     load_dotenv()
 
-    sql_config = {
-        "host": os.getenv("SQL_HOST"),
-        "user": os.getenv("SQL_USER"),
-        "password": os.getenv("SQL_PASSWORD"),
-        "database": os.getenv("SQL_DATABASE")
-    }
-    mongo_config = {
-        "uri": os.getenv("MONGO_URI"),
-        "database": os.getenv("MONGO_DATABASE"),
-        "collection": os.getenv("MONGO_COLLECTION")
-    }
+    from chester_ml.utils.catalog import CatalogError
 
-    logger.info("🧩 Environment Variables Check:")
-    logger.info("───────────────────────────────")
+    loader = StatementsLoader()
+    if os.path.isdir(loader.universe_dir):
+        try:
+            loader.load_statements()
+        except CatalogError:
+            # Los problemas ya se registraron; las rutas válidas se sondean igual.
+            pass
 
-    logger.info("🗄️  Checking SQL Configuration...")
-    sql_status = False
-    dynamic_log("   ", "Connecting to SQL...")
     try:
-        sql = SQLController(**sql_config)
-        if sql.test_connection():
-            logger.info("✅ SQL connection: OK (database reachable)")
-            sql_status = True
-        else:
-            logger.error("❌ SQL connection: FAILED (unreachable or misconfigured)")
-    except Exception as e:
-        logger.error(f"❌ SQL connection error: {e}")
-
-    logger.info("───────────────────────────────")
-
-    # ===== Mongo Check =====
-    logger.info("🍃 Checking MongoDB Configuration...")
-    mongo_status = False
-    dynamic_log("   ", "Connecting to MongoDB...")
-    try:
-        mongo = MongoController(**mongo_config)
-        if mongo.test_connection():
-            logger.info("✅ MongoDB connection: OK (cluster reachable)")
-            mongo_status = True
-        else:
-            logger.error("❌ MongoDB connection: FAILED (no response)")
-    except Exception as e:
-        logger.error(f"❌ MongoDB connection error: {e}")
-
-    logger.info("───────────────────────────────")
-
-    # ===== Result Summary =====
-    if sql_status and mongo_status:
-        logger.info("🎯 All systems operational — environment and databases loaded successfully.")
-    elif sql_status or mongo_status:
-        logger.warning("⚠️ Partial connectivity — at least one provider is unavailable.")
-    else:
-        logger.error("🚨 No providers reachable — check environment configuration.")
+        while True:
+            targets = configured_targets(loader.local_statements)
+            if not targets:
+                logger.error("🚨 No providers configured — check environment configuration.")
+                break
+
+            logger.info("───────────────────────────────")
+            logger.info(f"🩺 Probing {len(targets)} targets ({samples} samples each)...")
+            reports = run_probes(targets, samples, deadline or DEFAULT_DEADLINE)
+            log_reports(reports)
+            logger.info("───────────────────────────────")
+
+            healthy = sum(report["status"] == "ok" for report in reports)
+            if healthy == len(reports):
+                logger.info("🎯 All systems operational — environment and data sources reachable.")
+            elif healthy or any(report["samples"] for report in reports):
+                logger.warning("⚠️ Partial connectivity — at least one provider is unavailable or degraded.")
+            else:
+                logger.error("🚨 No providers reachable — check environment configuration.")
+
+            if not watch:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
 
     logger.info("✅ Status check complete.")
 
 
+def parse_provider_workers(values):
+    """Convierte ["sql=2", "mongo=4"] en {"sql": 2, "mongo": 4}."""
+    limits = {}
+    for value in values or []:
+        provider, _, count = value.partition("=")
+        if not count.isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid --provider-workers value: {value}")
+        limits[provider.strip().lower()] = int(count)
+    return limits
+
+
+def _unknown_provider(name):
+    try:
+        registry.get_provider(name)
+        return False
+    except KeyError:
+        return True
+
+
+def forward_to_daemon(args):
+    """
+    Reenvía `chester run` al daemon de `chester serve` si hay uno atendiendo
+    este mismo directorio. Devuelve False (y la ejecución sigue en local)
+    cuando no lo hay o la ejecución necesita el proceso local (--local,
+    --metrics, --profile o CHESTER_NO_DAEMON=1).
+    """
+    if args.local or args.metrics or args.profile or os.getenv("CHESTER_NO_DAEMON") == "1":
+        return False
+    from chester_ml.client import daemon_health, forward_run, inside
+
+    health = daemon_health()
+    if not health:
+        return False
+    if health.get("cwd") != os.getcwd():
+        logger.debug(f"Chester daemon serves {health.get('cwd')}; running locally.")
+        return False
+    if args.output and not inside(args.output, os.getcwd()):
+        logger.debug("Output outside the daemon's directory; running locally.")
+        return False
+
+    logger.debug(f"🛰️ Forwarding run to the Chester daemon (pid {health.get('pid')}).")
+    options = {
+        "output_path": args.output,
+        "workers": args.workers,
+        "provider_workers": parse_provider_workers(args.provider_workers),
+        "timeout": args.timeout,
+        "output_format": args.format,
+        "compression": args.compress,
+        "use_cache": not args.no_cache,
+        "refresh_cache": args.refresh,
+        "reset_watermarks": args.reset_watermarks,
+        "fail_fast": args.fail_fast,
+        "memory_limit_mb": args.memory_limit
+    }
+    if args.pool_size:
+        logger.warning("⚠️ --pool-size is ignored by the daemon; it keeps the pools it was started with.")
+    try:
+        ok = forward_run(args.providers, options, os.getenv("LOGGER_LEVELS", "ALL"))
+    except (OSError, ConnectionError) as e:
+        logger.error(f"❌ Lost the connection to the Chester daemon: {e}")
+        raise SystemExit(1)
+    if not ok:
+        raise SystemExit(1)
+    return True
+
+
+def run_train(args):
+    """Ejecuta `chester train` con la configuración `args.name` del universo."""
+    from chester_ml.training.search import log_report, run_search
+    from chester_ml.utils.statements_loader import StatementsLoader
+
+    from chester_ml.utils.catalog import CatalogError
+
+    loader = StatementsLoader()
+    try:
+        loader.load_statements()
+    except CatalogError:
+        raise SystemExit(1)
+    config = loader.training.get(args.name)
+    if not config:
+        available = ", ".join(loader.training) or "none"
+        logger.error(f"❌ Training config '{args.name}' not found (available: {available}).")
+        raise SystemExit(1)
+
+    report = run_search(args.name, config, args.data, args.n_jobs)
+    log_report(report)
+
+
+def run_bench(args):
+    """Ejecuta `chester bench` y sale con código 1 si algún caso falla o hay regresiones frente al baseline."""
+    import json
+    import sys
+    from chester_ml.benchmark import compare_to_baseline, log_report, run_benchmark
+
+    report = run_benchmark(args.rows, args.repeat, args.providers, args.formats, args.dir)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare_to_baseline(report, json.load(file), args.tolerance)
+
+    log_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=4)
+        logger.success(f"💾 Benchmark report saved to {args.output}")
+
+    for case in regressions:
+        logger.error(f"🐢 Regression: {case['provider']} → {case['format']} "
+                     f"{case['vs_baseline']:+.1%} rows/s vs baseline")
+    if regressions or any("error" in case for case in report["cases"]):
+        sys.exit(1)
+
+
 def main():
     """Punto de entrada principal del CLI de Chester ML."""
     setup_logger()
@@ -93,23 +198,244 @@ def main():
     run_parser.add_argument(
         "providers",
         nargs="+",
-        choices=["sql", "mongo", "files", "all"],
-        help="Proveedores a ejecutar (sql, mongo, files o all)"
+        help="Proveedores a ejecutar (sql, mongo, files, sqlite, proveedores de plugins o all)"
     )
     run_parser.add_argument(
         "--output",
-        help="Ruta opcional para guardar los resultados en formato JSON"
+        help="Ruta opcional para guardar los resultados (archivo para json, directorio para ndjson/npy)"
+    )
+    run_parser.add_argument(
+        "--format",
+        choices=["json", "ndjson", "npy"],
+        default="json",
+        help="Formato de salida: json (un documento), ndjson (JSON Lines por statement) "
+             "o npy (columnas NumPy por statement para scikit-learn)"
+    )
+    run_parser.add_argument(
+        "--compress",
+        choices=["gzip", "lzma"],
+        help="Compresión opcional de la salida"
+    )
+    run_parser.add_argument(
+        "--pool-size",
+        type=int,
+        help="Conexiones por pool SQL/Mongo reutilizadas durante la ejecución (por defecto CHESTER_POOL_SIZE o 5)"
     )
 
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de statements a ejecutar en paralelo (por defecto 1, secuencial)"
+    )
+    run_parser.add_argument(
+        "--provider-workers",
+        nargs="+",
+        metavar="PROVIDER=N",
+        help="Límite de concurrencia por proveedor, p. ej. sql=2 mongo=4"
+    )
+    run_parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Timeout por statement en segundos (un statement puede sobrescribirlo con \"timeout\")"
+    )
+    run_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No leer ni escribir la caché de resultados"
+    )
+    run_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignora la caché existente y la vuelve a poblar con resultados nuevos"
+    )
+    run_parser.add_argument(
+        "--reset-watermarks",
+        action="store_true",
+        help="Ignora las marcas de agua incrementales y extrae todo de nuevo"
+    )
+    run_parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Exporta tiempos por fase, filas, bytes y pico de memoria por statement "
+             "(JSON, o textfile de Prometheus si termina en .prom)"
+    )
+    run_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="chester.prof",
+        metavar="PATH",
+        help="Perfila la ejecución con cProfile y guarda el volcado pstats (por defecto chester.prof)"
+    )
+    run_parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Omite todos los statements pendientes en cuanto uno falla"
+    )
+    run_parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="Memoria aproximada para resultados en curso; al alcanzarla se frena a los lectores "
+             "y los resultados que no caben se vuelcan a disco"
+    )
+    run_parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Ejecuta en este proceso aunque haya un daemon de chester serve activo"
+    )
+
+    # Comando: serve
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Arranca un daemon que mantiene pools, caché y catálogo calientes para chester run"
+    )
+    transport = serve_parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--socket",
+        default=os.getenv("CHESTER_DAEMON_SOCKET"),
+        help="Socket Unix (0600) en el que escuchar (por defecto CHESTER_DAEMON_SOCKET o .chester_state/daemon.sock)"
+    )
+    transport.add_argument(
+        "--port",
+        type=int,
+        help="Escucha por HTTP en 127.0.0.1:PORT (0 elige uno libre) con un token guardado en "
+             ".chester_state/daemon.json"
+    )
+    serve_parser.add_argument("--pool-size", type=int, help="Conexiones por pool SQL/Mongo del daemon")
+
+    # Comando: bench
+    bench_parser = subparsers.add_parser("bench", help="Mide el rendimiento de extracción con datos sintéticos")
+    bench_parser.add_argument("--rows", type=int, default=100_000, help="Filas sintéticas por dataset (por defecto 100000)")
+    bench_parser.add_argument("--repeat", type=int, default=3, help="Ejecuciones medidas por caso (por defecto 3)")
+    bench_parser.add_argument(
+        "--providers",
+        nargs="+",
+        choices=["files", "sqlite"],
+        default=["files", "sqlite"],
+        help="Proveedores a medir"
+    )
+    bench_parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["json", "ndjson", "npy"],
+        default=["json", "ndjson", "npy"],
+        help="Formatos de salida a medir"
+    )
+    bench_parser.add_argument("--dir", help="Directorio de trabajo para los datos (temporal por defecto)")
+    bench_parser.add_argument("--output", help="Guarda el informe JSON en esta ruta")
+    bench_parser.add_argument("--baseline", help="Informe JSON previo contra el que detectar regresiones")
+    bench_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Caída de filas/s tolerada respecto al baseline antes de fallar (por defecto 0.10)"
+    )
+
+    # Comando: load
+    load_parser = subparsers.add_parser("load", help="Carga registros en bloque en una tabla SQL o colección Mongo")
+    source = load_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--file",
+        help="Archivo de origen (json, ndjson, csv, txt), p. ej. un .ndjson de una salida de chester run"
+    )
+    source.add_argument("--statement", help="Statement de origen como proveedor.nombre (p. ej. sql.orders)")
+    load_parser.add_argument(
+        "--select",
+        help="Con --file de una salida json de chester run: statement a cargar como proveedor.nombre"
+    )
+    load_parser.add_argument("--into", choices=["sql", "sqlite", "mongo"], required=True, help="Destino de la carga")
+    load_parser.add_argument("--table", required=True, help="Tabla SQL o colección Mongo de destino")
+    load_parser.add_argument("--database", help="Base de datos de destino (ruta del archivo para sqlite)")
+    load_parser.add_argument("--batch-size", type=int, help="Filas por executemany/insert_many y por commit")
+    load_parser.add_argument(
+        "--mode",
+        choices=["insert", "ignore", "upsert"],
+        default="insert",
+        help="SQL: inserta, ignora duplicados o los sobrescribe (por defecto insert)"
+    )
+    load_parser.add_argument("--key", help="Mongo: campo por el que hacer upsert en lugar de insertar")
+
+    # Comando: train
+    train_parser = subparsers.add_parser("train", help="Entrena un modelo con búsqueda de hiperparámetros en paralelo")
+    train_parser.add_argument("name", help="Configuración de entrenamiento definida en universes/*train*.json")
+    train_parser.add_argument("--data", help="Directorio npy de un statement ya extraído (chester run --format npy)")
+    train_parser.add_argument("--n-jobs", type=int, help="Procesos para la búsqueda (por defecto la configuración o -1)")
+
     # Comando: status
-    subparsers.add_parser("status", help="Verifica las conexiones y el entorno Chester")
+    status_parser = subparsers.add_parser("status", help="Verifica las conexiones y el entorno Chester")
+    status_parser.add_argument(
+        "--samples",
+        type=int,
+        default=1,
+        help="Conexiones + pings por proveedor para calcular percentiles de latencia (por defecto 1)"
+    )
+    status_parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Plazo total en segundos para todas las sondas (por defecto 5)"
+    )
+    status_parser.add_argument("--watch", action="store_true", help="Repite las sondas hasta Ctrl+C")
+    status_parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Segundos entre rondas con --watch (por defecto 5)"
+    )
 
     args = parser.parse_args()
 
     if args.command == "run":
-        execute_providers(args.providers, args.output)
+        unknown = [p for p in args.providers if p != "all" and _unknown_provider(p)]
+        if unknown:
+            parser.error(f"unknown providers: {', '.join(unknown)} "
+                         f"(available: {', '.join(registry.available_providers())}, all)")
+        if forward_to_daemon(args):
+            return
+
+        from chester_ml.core import execute_providers
+        from chester_ml.utils.catalog import CatalogError
+        try:
+            execute_providers(
+                args.providers,
+                args.output,
+                args.pool_size,
+                workers=args.workers,
+                provider_workers=parse_provider_workers(args.provider_workers),
+                timeout=args.timeout,
+                output_format=args.format,
+                compression=args.compress,
+                use_cache=not args.no_cache,
+                refresh_cache=args.refresh,
+                reset_watermarks=args.reset_watermarks,
+                metrics_path=args.metrics,
+                profile_path=args.profile,
+                fail_fast=args.fail_fast,
+                memory_limit_mb=args.memory_limit
+            )
+        except CatalogError:
+            raise SystemExit(1)
+    elif args.command == "serve":
+        from chester_ml.server import serve
+        serve(args.port, args.socket, args.pool_size)
+    elif args.command == "load":
+        from chester_ml.bulk_load import file_batches, load_records, statement_batches
+        if args.select and not args.file:
+            parser.error("--select needs --file")
+        try:
+            batches = file_batches(args.file, select=args.select) if args.file else statement_batches(args.statement)
+            load_records(batches, args.into, args.table, args.batch_size, args.mode, args.key, args.database)
+        except Exception as e:
+            logger.error(f"❌ Load failed: {e}")
+            raise SystemExit(1)
+    elif args.command == "train":
+        run_train(args)
+    elif args.command == "bench":
+        if args.rows < 1 or args.repeat < 1:
+            parser.error("--rows and --repeat must be at least 1")
+        run_bench(args)
     elif args.command == "status":
-        check_status()
+        check_status(max(1, args.samples), args.timeout, args.watch, args.interval)
     else:
         parser.print_help()
 
@@ -0,0 +1,110 @@
+import http.client
+import json
+import os
+import socket
+import sys
+from chester_ml.utils.watermark_store import DEFAULT_STATE_DIR
+
+LOOPBACK = "127.0.0.1"
+SOCKET_FILE = "daemon.sock"
+# Port and bearer token of a daemon started with --port; readable only by its owner.
+TOKEN_FILE = "daemon.json"
+# The thin client must not make every CLI call wait on a missing daemon.
+PROBE_TIMEOUT = 0.25
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def state_path(filename):
+    return os.path.join(os.getenv("CHESTER_STATE_DIR", DEFAULT_STATE_DIR), filename)
+
+
+def inside(path, root):
+    """True when `path` resolves to a location under the directory `root`."""
+    root = os.path.realpath(root)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+
+def daemon_address():
+    """
+    Where a daemon for this directory listens: its Unix socket path
+    (CHESTER_DAEMON_SOCKET or the state directory's daemon.sock), a
+    (host, port, token) tuple read from daemon.json, or None.
+    """
+    socket_path = os.getenv("CHESTER_DAEMON_SOCKET") or state_path(SOCKET_FILE)
+    if os.path.exists(socket_path):
+        return socket_path
+    try:
+        with open(state_path(TOKEN_FILE), "r", encoding="utf-8") as file:
+            endpoint = json.load(file)
+        return LOOPBACK, int(endpoint["port"]), endpoint["token"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _connection(address, timeout):
+    if isinstance(address, str):
+        return _UnixConnection(address, timeout), {}
+    host, port, token = address
+    return http.client.HTTPConnection(host, port, timeout=timeout), {"Authorization": f"Bearer {token}"}
+
+
+def daemon_health(timeout=PROBE_TIMEOUT):
+    """
+    Returns the /health document of a running `chester serve`, or None when
+    nothing (or something that is not Chester) answers at daemon_address().
+    """
+    address = daemon_address()
+    if address is None:
+        return None
+    connection, headers = _connection(address, timeout)
+    try:
+        connection.request("GET", "/health", headers=headers)
+        response = connection.getresponse()
+        health = json.loads(response.read()) if response.status == 200 else None
+    except (OSError, ValueError, http.client.HTTPException):
+        return None
+    finally:
+        connection.close()
+    return health if isinstance(health, dict) and health.get("service") == "chester" else None
+
+
+def forward_run(providers, options, log_levels=None, stream=None):
+    """
+    Sends a run to the daemon and relays its log lines to `stream` (stderr
+    by default) as they arrive. Returns True when the run succeeded.
+    """
+    stream = stream or sys.stderr
+    address = daemon_address()
+    if address is None:
+        raise ConnectionError("No Chester daemon is running for this directory")
+    connection, headers = _connection(address, None)
+    body = json.dumps({"providers": providers, "options": options, "log_levels": log_levels})
+    try:
+        connection.request("POST", "/run", body, {**headers, "Content-Type": "application/json"})
+        response = connection.getresponse()
+        if response.status != 200:
+            stream.write(f"Chester daemon rejected the run: {response.status} {response.read().decode()}\n")
+            return False
+        ok = False
+        for line in response:
+            message = json.loads(line)
+            if "log" in message:
+                stream.write(message["log"])
+                stream.flush()
+            elif message.get("done"):
+                ok = bool(message.get("ok"))
+        return ok
+    finally:
+        connection.close()
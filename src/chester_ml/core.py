@@ -1,67 +1,597 @@
-import json
+import contextvars
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack
 from loguru import logger
 from chester_ml.utils.statements_loader import StatementsLoader
-from chester_ml.engines.remote_engine import RemoteEngine
-from chester_ml.engines.local_engine import LocalEngine
+from chester_ml.engines.cached_engine import CachedEngine
+from chester_ml.engines.incremental import IncrementalExtractor
+from chester_ml.providers.database_providers.connection_manager import ConnectionManager
+from chester_ml.providers.registry import available_providers, get_provider, get_section, load_object
+from chester_ml.utils.batch_spool import SpilledResult, dump_batch
+from chester_ml.utils import metrics, progress
+from chester_ml.utils.memory_budget import MB, MemoryBudget, estimate_bytes
+from chester_ml.utils.metrics import MetricsRecorder, span
+from chester_ml.utils.profiler import RunProfiler, thread_profile
+from chester_ml.utils.progress import ProgressReporter
+from chester_ml.utils.result_cache import ResultCache
+from chester_ml.utils.watermark_store import WatermarkStore
 
+WATCHDOG_INTERVAL = 0.5
+_END = object()
 
-def execute_providers(providers, output_path=None):
+# Writers (and engines, via the provider registry) are imported on demand.
+OUTPUT_WRITERS = {
+    "json": "chester_ml.writers.json_writer:JSONWriter",
+    "ndjson": "chester_ml.writers.ndjson_writer:NDJSONWriter",
+    "npy": "chester_ml.writers.numpy_writer:NumpyWriter"
+}
+
+
+class StatementTimeout(Exception):
+    """Raised inside a worker when its statement exceeds its timeout."""
+
+
+def execute_providers(providers, output_path=None, pool_size=None, workers=1,
+                      provider_workers=None, timeout=None, output_format="json", compression=None,
+                      use_cache=True, refresh_cache=False, reset_watermarks=False,
+                      metrics_path=None, profile_path=None, universe_dir="universes", as_dataset=False,
+                      fail_fast=False, manager=None, cache=None, memory_limit_mb=None):
     """
-    Ejecuta uno o varios proveedores (sql, mongo, files, o all).
-    Si se especifica output_path, guarda los resultados en un JSON.
+    Ejecuta uno o varios proveedores registrados (sql, mongo, files, sqlite, plugins o all).
+    Si se especifica output_path, guarda los resultados en el formato indicado:
+    "json" (un único documento), "ndjson" (un archivo JSON Lines por statement
+    dentro del directorio output_path), opcionalmente comprimidos con gzip/lzma,
+    o "npy" (columnas NumPy tipadas por statement, listas para mmap_mode="r").
+
+    Devuelve {proveedor: {statement: filas}} solo cuando no hay salida
+    configurada; con salida, los resultados se escriben y se liberan en cuanto
+    llegan para mantener la memoria acotada.
+
+    Las conexiones SQL/Mongo se reutilizan entre statements mediante un
+    ConnectionManager que vive durante toda la ejecución (pool_size por pool).
+
+    Los statements con "stream": true devuelven lotes de filas que se escriben
+    al archivo de salida a medida que llegan, sin materializar el resultado.
+
+    Con workers > 1 los statements se ejecutan en paralelo en un pool de hilos;
+    provider_workers limita la concurrencia por proveedor ({"sql": 2, ...}) y
+    timeout (o "timeout" en el statement) corta statements lentos.
+
+    Los resultados cacheables se guardan en disco (ver CachedEngine);
+    use_cache=False desactiva la caché y refresh_cache=True la ignora al leer
+    pero la vuelve a poblar.
+
+    Los statements con "incremental" solo extraen filas más nuevas que la
+    última marca de agua guardada y las combinan con la salida previa;
+    reset_watermarks=True fuerza una extracción completa.
+
+    metrics_path exporta tiempos por fase (connect, query, fetch, serialize,
+    write), filas, bytes y pico de memoria de cada statement como JSON o, si
+    termina en .prom, como textfile de Prometheus. profile_path guarda un
+    volcado de cProfile (pstats) de la ejecución, incluidos los hilos.
+
+    universe_dir indica el directorio de los archivos de statements, que se
+    validan antes de ejecutar nada (CatalogError si algo no es válido).
+
+    Un statement puede declarar "depends_on": ["SQL.clientes", "pedidos"]
+    (un nombre sin proveedor es del mismo proveedor): solo empieza cuando
+    sus dependencias terminan bien, las dependencias de otros proveedores se
+    añaden a la ejecución y, si una falla o no devuelve resultados, los
+    statements que dependen de ella se omiten. Entre los statements listos se despachan primero los de
+    la ruta crítica más larga ("cost" estima la duración relativa de cada
+    uno). fail_fast=True omite además todo lo pendiente tras el primer fallo.
+
+    Los statements JOIN combinan resultados de otros proveedores con hash
+    joins y agregaciones group-by (ver engines/join_engine.py): sus entradas
+    se copian a disco durante la ejecución y, si superan "memory_limit_mb",
+    las tablas hash se particionan y se vuelcan a disco.
+
+    Los statements con "train" entrenan un estimador incremental de
+    scikit-learn (partial_fit) sobre sus lotes a medida que llegan y guardan
+    el modelo con joblib (ver training/stream_trainer.py).
+
+    Sin salida configurada, as_dataset=True (o "dataset": true en el
+    statement) devuelve cada resultado como un Dataset columnar (ver
+    utils/dataset.py) en lugar de una lista de dicts; los statements en
+    streaming también se conservan así, lote a lote.
+
+    memory_limit_mb acota (aproximadamente) la memoria de los resultados en
+    curso: cuando se alcanza, los lectores esperan a que la salida consuma
+    lotes (backpressure) en lugar de leer más. Con un límite, los statements
+    sin "stream" también se leen por lotes, y los resultados que se devuelven
+    y ya no caben se vuelcan a disco como SpilledResult (utils/batch_spool.py),
+    que se itera fila a fila igual que una lista.
+
+    manager y cache permiten reutilizar un ConnectionManager y una
+    ResultCache ya abiertos (p. ej. los del daemon de `chester serve`); un
+    manager recibido no se cierra al terminar.
     """
-    loader = StatementsLoader()
+    loader = StatementsLoader(universe_dir)
     loader.load_statements()
 
-    available_providers = {
-        "sql": ("remote", "SQL"),
-        "mongo": ("remote", "MONGO"),
-        "files": ("local", "FILES")
-    }
-
     if "all" in providers:
-        providers = ["sql", "mongo", "files"]
+        providers = available_providers()
 
     all_results = {}
+    writer = None
+    owns_manager = manager is None
+    manager = manager or ConnectionManager(pool_size)
+
+    if not use_cache:
+        cache = None
+    elif cache is None:
+        try:
+            cache = ResultCache()
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache unavailable, running without it: {e}")
+
+    if output_path:
+        try:
+            writer = load_object(OUTPUT_WRITERS[output_format])(output_path, compression)
+        except Exception as e:
+            logger.error(f"❌ Failed to open output file: {e}")
 
     logger.info("───────────────────────────────")
     logger.info("🚀 Starting Chester ML Engine")
     logger.info("───────────────────────────────")
 
-    for p in providers:
-        context, provider = available_providers[p]
-        statements = loader.remote_statements if context == "remote" else loader.local_statements
-        provider_statements = statements.get(provider, {})
+    incremental = IncrementalExtractor(WatermarkStore(), reset_watermarks)
+    budget = MemoryBudget(memory_limit_mb * MB) if memory_limit_mb else None
 
+    requested = []
+    for p in providers:
+        spec = get_provider(p)
+        statements = loader.remote_statements if spec.context == "remote" else loader.local_statements
+        provider_statements = statements.get(spec.section, {})
         if not provider_statements:
-            logger.warning(f"⚠️ No statements found for {provider} in {context}.")
+            logger.warning(f"⚠️ No statements found for {spec.section} in {spec.context}.")
             continue
+        requested.extend(f"{spec.section}.{name}" for name in provider_statements)
 
-        engine = RemoteEngine() if context == "remote" else LocalEngine()
-        logger.info(f"🗄️ Provider: {provider} ({context})")
+    # Upstream statements ("depends_on") of other providers join the run.
+    labels = loader.catalog.with_dependencies(requested) if requested else []
+    for label in labels:
+        if label not in requested:
+            logger.info(f"➕ Adding upstream dependency {label}")
 
-        all_results[provider] = {}
+    tasks = {}
+    engines = {}
+    for label in labels:
+        provider, _, name = label.partition(".")
+        spec = get_section(provider)
+        if provider not in engines:
+            engine = spec.load_engine()(manager)
+            if cache:
+                engine = CachedEngine(engine, cache, refresh_cache)
+            engines[provider] = engine
+            count = sum(other.partition(".")[0] == provider for other in labels)
+            logger.info(f"🗄️ Provider: {provider} ({spec.context}) — {count} statements")
+            all_results[provider] = {}
 
-        for name, statement in provider_statements.items():
-            logger.info(f"▶️ Running statement: {name}")
-            try:
-                result = engine.execute(provider, statement)
-                if result is not None:
-                    logger.success(f"✅ Completed: {name}")
-                    all_results[provider][name] = result
-                else:
-                    logger.warning(f"⚠️ No results for {name}")
-            except Exception as e:
-                logger.error(f"❌ Failed {name}: {e}")
+        statements = loader.remote_statements if spec.context == "remote" else loader.local_statements
+        statement = statements[provider][name]
+        statement_timeout = statement.get("timeout", timeout)
+        if statement_timeout:
+            statement = {**statement, "timeout": float(statement_timeout)}
+        collect = False
+        reads_whole = getattr(engines[provider], "reads_whole", None)
+        if budget and not statement.get("stream") and not (reads_whole and reads_whole(provider, statement)):
+            # Read by batches so the budget can throttle it; _collect() rebuilds the result.
+            statement = {**statement, "stream": True}
+            collect = True
+        tasks[label] = _Task(spec.name, provider, name, statement, engines[provider], incremental,
+                             statement.get("dataset", as_dataset))
+        tasks[label].budget = budget
+        tasks[label].collect = collect
+    spool_dir = None
+    for label, task in tasks.items():
+        task.depends_on = [tasks[dependency] for dependency in loader.catalog.dependencies[label]]
+        inputs = loader.catalog.inputs.get(label)
+        if inputs:
+            # The statements a JOIN reads keep a copy of their result on disk.
+            spool_dir = spool_dir or tempfile.mkdtemp(prefix="chester-spool-")
+            for upstream in inputs:
+                tasks[upstream].spool_path = os.path.join(spool_dir, f"{upstream}.pkl")
+            task.statement = {**task.statement, "_inputs": [tasks[upstream].spool_path for upstream in inputs]}
+    tasks = list(tasks.values())
+
+    recorder = MetricsRecorder(exclusive=int(workers or 1) <= 1) if metrics_path else None
+
+    with ExitStack() as stack:
+        if spool_dir:
+            stack.callback(shutil.rmtree, spool_dir, True)
+        if profile_path:
+            stack.enter_context(RunProfiler(profile_path))
+        if recorder:
+            stack.enter_context(recorder)
+
+        try:
+            with ProgressReporter() as reporter:
+                _run_tasks(tasks, workers, provider_workers or {}, writer, all_results, reporter, fail_fast)
+        finally:
+            if owns_manager:
+                manager.close()
 
         logger.info("───────────────────────────────")
 
-    if output_path:
+        if budget:
+            budget.log_summary()
+
+        if writer:
+            try:
+                writer.close()
+                logger.success(f"💾 Results saved to {output_path}")
+            except Exception as e:
+                logger.error(f"❌ Failed to save results: {e}")
+
+    if recorder:
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(all_results, f, indent=4)
-            logger.success(f"💾 Results saved to {output_path}")
+            recorder.export(metrics_path)
         except Exception as e:
-            logger.error(f"❌ Failed to save results: {e}")
+            logger.error(f"❌ Failed to write metrics: {e}")
 
     logger.info("🎯 Execution complete!")
+    return all_results
+
+
+class _Task:
+    """Un statement pendiente de ejecutar, con su estado de ejecución."""
+
+    def __init__(self, key, provider, name, statement, engine, incremental=None, as_dataset=False):
+        self.key = key
+        self.provider = provider
+        self.name = name
+        self.statement = statement
+        self.engine = engine
+        self.incremental = incremental
+        self.as_dataset = as_dataset
+        self.timeout = statement.get("timeout")
+        self.cancelled = threading.Event()
+        self.started_at = None
+        self.counter = progress.ProgressCounter(self.label)
+        self.metrics = None
+        self.depends_on = []
+        self.status = None
+        self.cost = float(statement.get("cost", 1.0))
+        self.spool_path = None
+        self.budget = None
+        self.collect = False
+
+    def execute(self):
+        if self.incremental and "incremental" in self.statement:
+            return self.incremental.execute(self.engine, self.provider, self.name, self.statement)
+        return self.engine.execute(self.provider, self.statement)
+
+    @property
+    def label(self):
+        return f"{self.provider}.{self.name}"
+
+    def expired(self, now):
+        return bool(self.timeout and self.started_at and now - self.started_at > self.timeout)
+
+
+# Los controladores devuelven None cuando una consulta falla, así que un
+# statement sin resultados ("empty") tampoco satisface a sus dependientes.
+FAILED_STATUSES = ("failed", "empty", "timeout", "skipped")
+
+
+def _critical_paths(tasks):
+    """
+    Prioridad de cada statement: su coste más el de la cadena más larga de
+    statements que dependen de él (ruta crítica hasta el final del DAG).
+    """
+    dependents = {task: [] for task in tasks}
+    for task in tasks:
+        for dependency in task.depends_on:
+            dependents[dependency].append(task)
+
+    priority = {}
+
+    def path(task):
+        if task not in priority:
+            priority[task] = task.cost + max((path(other) for other in dependents[task]), default=0.0)
+        return priority[task]
+
+    for task in tasks:
+        path(task)
+    return priority
+
+
+def _skip(task, reason):
+    task.status = "skipped"
+    with metrics.track(task.provider, task.name) as statement_metrics:
+        if statement_metrics:
+            statement_metrics.status = "skipped"
+    logger.warning(f"⏭️ Skipped {task.label}: {reason}")
+
+
+def _run_tasks(tasks, workers, provider_workers, writer, all_results, reporter=None, fail_fast=False):
+    """
+    Despacha los statements a un máximo de `workers` hilos respetando el límite
+    de concurrencia de cada proveedor y sus dependencias ("depends_on"), y
+    abandona los que superan su timeout. Entre los listos se lanzan primero
+    los de mayor ruta crítica; los que dependen de un statement fallido (o
+    todo lo pendiente, con fail_fast) se omiten sin ejecutarse.
+
+    Se usan hilos daemon para que un driver bloqueado no impida terminar la
+    ejecución una vez abandonado su statement.
+    """
+    workers = max(1, int(workers or 1))
+    lock = threading.Lock()
+    finished = queue.Queue()
+    priority = _critical_paths(tasks)
+    pending = sorted(tasks, key=lambda task: -priority[task])
+    running = set()
+    active = {}
+    settled = set()
+
+    while pending or running:
+        for task in list(pending):
+            if len(running) >= workers:
+                break
+            failed = [dependency for dependency in task.depends_on if dependency.status in FAILED_STATUSES]
+            if failed:
+                pending.remove(task)
+                _skip(task, f"upstream {failed[0].label} {failed[0].status}")
+                settled.add(task)
+                continue
+            if not all(dependency in settled for dependency in task.depends_on):
+                continue
+            limit = int(provider_workers.get(task.key, workers))
+            if active.get(task.key, 0) >= limit:
+                continue
+            pending.remove(task)
+            if reporter:
+                task.counter = reporter.track(task.label)
+            active[task.key] = active.get(task.key, 0) + 1
+            running.add(task)
+            # Each thread runs in a copy of the dispatcher's context, so
+            # logger.contextualize() values reach the statement's logs.
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(_run_statement, task, writer, all_results, lock, finished),
+                name=f"chester-{task.label}",
+                daemon=True
+            ).start()
+
+        if not running:
+            # Only reachable if a dependency never entered the run.
+            for task in pending:
+                _skip(task, "dependencies never completed")
+            break
+
+        try:
+            done = [finished.get(timeout=WATCHDOG_INTERVAL)]
+            while not finished.empty():
+                done.append(finished.get_nowait())
+        except queue.Empty:
+            done = []
+
+        now = time.monotonic()
+        for task in list(running):
+            if task in done:
+                pass
+            elif task.expired(now):
+                task.cancelled.set()
+                task.status = "timeout"
+                task.counter.finish()
+                if task.metrics:
+                    task.metrics.status = "timeout"
+                    task.metrics.wall = task.counter.elapsed
+                    task.metrics.rows = task.counter.rows
+                if writer:
+                    writer.discard(task.provider, task.name)
+                logger.error(f"⏱️ Timed out {task.label} after {task.timeout:.1f}s — abandoning it.")
+            else:
+                continue
+            running.discard(task)
+            settled.add(task)
+            active[task.key] -= 1
+            if fail_fast and task.status in FAILED_STATUSES and pending:
+                for other in pending:
+                    _skip(other, f"fail-fast after {task.label} {task.status}")
+                    settled.add(other)
+                pending.clear()
+
+
+def _run_statement(task, writer, all_results, lock, finished):
+    """Ejecuta un statement en su propio hilo; nunca propaga excepciones."""
+    try:
+        with thread_profile(), metrics.track(task.provider, task.name) as task.metrics:
+            _execute_statement(task, writer, all_results, lock)
+    except Exception as e:
+        # Failures around the statement (profiling, metrics) must not pass silently.
+        logger.error(f"❌ Failed {task.label}: {e}")
+        task.status = task.status or "failed"
+        if writer:
+            writer.discard(task.provider, task.name)
+    finally:
+        finished.put(task)
+
+
+def _execute_statement(task, writer, all_results, lock):
+    task.started_at = time.monotonic()
+    progress.bind(task.counter)
+    status = "failed"
+    logger.info(f"▶️ Running statement: {task.label}")
+    try:
+        with span("execute"):
+            result = task.execute()
+        if task.cancelled.is_set():
+            status = "timeout"
+            return
+        if result is not None and "train" in task.statement:
+            result = _train(task, result)
+        if result is not None and task.spool_path:
+            result = _spool(task, result)
+        if isinstance(result, Iterator):
+            rows = _consume_stream(writer, task, result, all_results, lock)
+            logger.success(f"✅ Completed: {task.label} ({rows} rows streamed)")
+            status = "ok"
+        elif result is not None:
+            task.counter.add(rows=len(result) if isinstance(result, list) else 1)
+            if writer:
+                rows = result if isinstance(result, list) else [result]
+                with span("write"):
+                    writer.write_statement(task.provider, task.name, [rows])
+            else:
+                if task.as_dataset:
+                    result = _to_dataset([result if isinstance(result, list) else [result]])
+                elif task.budget and isinstance(result, list) and not task.budget.retain(estimate_bytes(result)):
+                    result = _spill(task, [result], [])
+                with lock:
+                    all_results[task.provider][task.name] = result
+            logger.success(f"✅ Completed: {task.label}")
+            status = "ok"
+        else:
+            logger.warning(f"⚠️ No results for {task.label}")
+            status = "empty"
+    except StatementTimeout:
+        status = "timeout"
+        logger.error(f"⏱️ Stopped {task.label}: exceeded {task.timeout:.1f}s timeout.")
+        if writer:
+            writer.discard(task.provider, task.name)
+    except Exception as e:
+        logger.error(f"❌ Failed {task.label}: {e}")
+        if writer:
+            writer.discard(task.provider, task.name)
+    finally:
+        task.counter.finish()
+        progress.bind(None)
+        if task.status is None:
+            task.status = status
+        if task.metrics and task.metrics.status == "running":
+            task.metrics.status = status
+            task.metrics.rows = task.counter.rows
+            task.metrics.bytes = task.counter.bytes
+
+
+def _consume_stream(writer, task, batches, all_results=None, lock=None):
+    """
+    Drena un resultado en streaming, escribiéndolo si hay salida configurada
+    o acumulándolo en un Dataset si el statement lo pide. Con presupuesto de
+    memoria, cada lote ocupa su parte hasta que se consume (backpressure).
+    """
+    if task.budget:
+        batches = task.budget.throttle(batches, task.cancelled)
+    batches = _check_deadline(task, batches)
+    if writer:
+        with span("write"):
+            return writer.write_statement(task.provider, task.name, batches)
+    if task.as_dataset:
+        dataset = _to_dataset(batches)
+        with lock:
+            all_results[task.provider][task.name] = dataset
+        return len(dataset)
+    if task.collect:
+        result = _collect(task, batches)
+        with lock:
+            all_results[task.provider][task.name] = result
+        return len(result)
+    return sum(len(batch) for batch in batches)
+
+
+def _collect(task, batches):
+    """
+    Reconstruye el resultado de un statement que solo se leyó por lotes para
+    respetar el presupuesto: las filas quedan en memoria mientras caben y, en
+    cuanto un lote no cabe, todo el resultado pasa a un SpilledResult en disco.
+    """
+    rows = []
+    retained = 0
+    for batch in batches:
+        size = estimate_bytes(batch)
+        if not task.budget.retain(size, batch):
+            return _spill(task, [rows, batch], batches, retained)
+        rows.extend(batch)
+        retained += size
+    return rows
+
+
+def _spill(task, head, batches, retained=0):
+    spilled = SpilledResult(os.getenv("CHESTER_SPILL_DIR"))
+    with span("spill"):
+        for batch in head:
+            spilled.add(batch)
+        head.clear()
+        task.budget.forget(retained)
+        for batch in batches:
+            spilled.add(batch)
+        spilled.close()
+    task.budget.spilled(len(spilled))
+    logger.info(f"💾 {task.label} exceeded the memory budget; {len(spilled):,} rows spilled to disk.")
+    return spilled
+
+
+def _train(task, result):
+    """
+    Etapa de entrenamiento ("train" en el statement): los streams se envuelven
+    para entrenar lote a lote mientras se escriben; las listas se entrenan ya.
+    """
+    from chester_ml.training.stream_trainer import StreamTrainer
+    trainer = StreamTrainer(task.statement["train"], task.provider, task.name)
+    if isinstance(result, Iterator):
+        return trainer.fit_stream(result)
+    for _ in trainer.fit_stream([result if isinstance(result, list) else [result]]):
+        pass
+    return result
+
+
+def _spool(task, result):
+    """
+    Guarda una copia del resultado en disco (batch_spool) para los JOIN que
+    lo leen; los streams se copian lote a lote mientras pasan.
+    """
+    if not isinstance(result, Iterator):
+        with open(task.spool_path, "wb") as file:
+            dump_batch(file, result if isinstance(result, list) else [result])
+        return result
+    return _tee(result, task.spool_path)
+
+
+def _tee(batches, path):
+    try:
+        with open(path, "wb") as file:
+            for batch in batches:
+                dump_batch(file, batch)
+                yield batch
+    finally:
+        if hasattr(batches, "close"):
+            batches.close()
+
+
+def _to_dataset(batches):
+    # NumPy is only imported by runs that ask for Datasets.
+    from chester_ml.utils.dataset import Dataset
+    with span("serialize"):
+        return Dataset.from_batches(batches)
+
+
+def _check_deadline(task, batches):
+    """
+    Corta el stream entre lotes si el statement fue cancelado o expiró.
+    El tiempo de espera de cada lote se mide como la fase "fetch".
+    """
+    iterator = iter(batches)
+    try:
+        while True:
+            with span("fetch"):
+                batch = next(iterator, _END)
+            if batch is _END:
+                if task.cancelled.is_set():
+                    # The budget stops throttled streams quietly on cancellation.
+                    raise StatementTimeout(task.label)
+                return
+            if task.cancelled.is_set() or task.expired(time.monotonic()):
+                raise StatementTimeout(task.label)
+            task.counter.add(rows=len(batch))
+            yield batch
+    finally:
+        if hasattr(batches, "close"):
+            batches.close()
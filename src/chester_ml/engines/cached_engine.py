@@ -0,0 +1,58 @@
+from collections.abc import Iterator
+from loguru import logger
+
+
+class CachedEngine:
+    """
+    Wraps a Remote/Local engine with the on-disk ResultCache.
+
+    FILES and SQLITE statements are cached by default, keyed on the file's
+    mtime and size. SQL/MONGO statements are cached only when they declare a
+    "freshness_query" (whose result becomes the fingerprint) and/or a
+    "cache_ttl" in seconds. "cache": false opts a statement out, and
+    incremental statements are never cached (their state lives elsewhere),
+    nor are JOIN statements, whose inputs are spooled by each run.
+    """
+
+    def __init__(self, engine, cache, refresh=False):
+        self.engine = engine
+        self.cache = cache
+        self.refresh = refresh
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def _cacheable(self, provider_type, statement):
+        if statement.get("cache") is False or "incremental" in statement or "_inputs" in statement:
+            return False
+        if provider_type in ("FILES", "SQLITE") or statement.get("cache"):
+            return True
+        return "freshness_query" in statement or "cache_ttl" in statement
+
+    def execute(self, provider_type, statement):
+        if not self._cacheable(provider_type, statement):
+            return self.engine.execute(provider_type, statement)
+
+        try:
+            fingerprint = self.engine.fingerprint(provider_type, statement)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fingerprint {provider_type} source, skipping cache: {e}")
+            return self.engine.execute(provider_type, statement)
+
+        key = self.cache.key_for(provider_type, statement, fingerprint)
+        ttl = statement.get("cache_ttl")
+
+        if not self.refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"💽 Cache hit for {provider_type} statement ({key[:12]}).")
+                return cached if statement.get("stream") else [row for batch in cached for row in batch]
+
+        result = self.engine.execute(provider_type, statement)
+        if isinstance(result, Iterator):
+            return self.cache.store(key, result, ttl, label=provider_type)
+        if isinstance(result, list):
+            # Drain the pass-through generator so the entry is committed now.
+            for _ in self.cache.store(key, [result], ttl, label=provider_type):
+                pass
+        return result
@@ -0,0 +1,363 @@
+import os
+import pickle
+import shutil
+import tempfile
+from loguru import logger
+from chester_ml.utils.batch_spool import SpillPartitions, replay_batches
+
+DEFAULT_MEMORY_LIMIT_MB = 256
+DEFAULT_PARTITIONS = 16
+MAX_PARTITION_DEPTH = 3
+OUTPUT_BATCH_SIZE = 10000
+MB = 1024 * 1024
+
+# Live dicts take several times their pickled size; the budget is checked
+# against this estimate, sampled from each incoming batch.
+ROW_OVERHEAD = 4
+SIZE_SAMPLE_ROWS = 64
+# Rough in-memory size of one group's key and accumulators.
+GROUP_BYTES = 256
+
+JOIN_TYPES = ("inner", "left")
+CASTS = {"str": str, "int": int, "float": float}
+
+
+def _add(acc, value):
+    return value if acc is None else acc + value
+
+
+def _min(acc, value):
+    return value if acc is None or (value is not None and value < acc) else acc
+
+
+def _max(acc, value):
+    return value if acc is None or (value is not None and value > acc) else acc
+
+
+# name → (initial state, step(state, non-null value), merge(state, state), final(state))
+AGGREGATORS = {
+    "count": (0, lambda acc, value: acc + 1, lambda a, b: a + b, None),
+    "sum": (None, _add, lambda a, b: a if b is None else _add(a, b), None),
+    "min": (None, _min, _min, None),
+    "max": (None, _max, _max, None),
+    "mean": ((0, 0), lambda acc, value: (acc[0] + value, acc[1] + 1),
+             lambda a, b: (a[0] + b[0], a[1] + b[1]), lambda acc: acc[0] / acc[1] if acc[1] else None),
+    "first": (None, lambda acc, value: value if acc is None else acc, lambda a, b: b if a is None else a, None),
+    "last": (None, lambda acc, value: value, lambda a, b: a if b is None else b, None)
+}
+
+
+def _joins(statement):
+    joins = statement.get("join") or []
+    return [joins] if isinstance(joins, dict) else list(joins)
+
+
+def join_inputs(statement):
+    """Statements read by a JOIN statement, in order: "from", then each join's "with"."""
+    inputs = [statement["from"]] if isinstance(statement.get("from"), str) else []
+    return inputs + [join["with"] for join in _joins(statement) if isinstance(join, dict) and join.get("with")]
+
+
+def _columns(value):
+    return [value] if isinstance(value, str) else list(value or [])
+
+
+def join_plan(statement):
+    """
+    Normalizes a JOIN statement into (joins, group_by, aggregates) and raises
+    ValueError on anything malformed:
+
+        "from": "SQL.customers",
+        "join": [{"with": "MONGO.events", "on": {"left": "id", "right": "customer_id"},
+                  "how": "left", "prefix": "event_", "cast": "str"}],
+        "group_by": ["id"],
+        "aggregate": {"events": "count", "spend": ["sum", "event_amount"]}
+    """
+    joins = []
+    for join in _joins(statement):
+        if not isinstance(join, dict) or not join.get("with") or not join.get("on"):
+            raise ValueError("each join needs \"with\" and \"on\"")
+        on = join["on"]
+        left, right = (on.get("left"), on.get("right")) if isinstance(on, dict) else (on, on)
+        left, right = _columns(left), _columns(right)
+        if not left or len(left) != len(right):
+            raise ValueError(f"join with {join['with']}: \"on\" needs as many left as right keys")
+        how = join.get("how", "inner")
+        if how not in JOIN_TYPES:
+            raise ValueError(f"join with {join['with']}: \"how\" must be one of {', '.join(JOIN_TYPES)}")
+        cast = join.get("cast")
+        if cast is not None and cast not in CASTS:
+            raise ValueError(f"join with {join['with']}: \"cast\" must be one of {', '.join(CASTS)}")
+        joins.append({
+            "with": join["with"],
+            "left": left,
+            "right": right,
+            "how": how,
+            "prefix": join.get("prefix", ""),
+            "cast": CASTS.get(cast)
+        })
+
+    aggregates = []
+    for output, spec in (statement.get("aggregate") or {}).items():
+        if isinstance(spec, str):
+            function, column = spec, None
+        elif isinstance(spec, list) and len(spec) == 2:
+            function, column = spec
+        else:
+            raise ValueError(f"aggregate \"{output}\" must be \"count\" or [function, column]")
+        if function not in AGGREGATORS:
+            raise ValueError(f"aggregate \"{output}\": unknown function '{function}' "
+                             f"(use {', '.join(AGGREGATORS)})")
+        if function != "count" and not column:
+            raise ValueError(f"aggregate \"{output}\": {function} needs a column")
+        aggregates.append((output, function, column))
+    return joins, _columns(statement.get("group_by")), aggregates
+
+
+def _key_getter(columns, cast=None):
+    """Row → join key; None (never matches) when any key column is null."""
+    if len(columns) == 1:
+        column = columns[0]
+        if cast is None:
+            return lambda row: row.get(column)
+        return lambda row: None if row.get(column) is None else cast(row[column])
+
+    def key(row):
+        values = tuple(row.get(column) for column in columns)
+        if None in values:
+            return None
+        return tuple(cast(value) for value in values) if cast else values
+    return key
+
+
+def _row_bytes(batch):
+    sample = batch[:SIZE_SAMPLE_ROWS]
+    return ROW_OVERHEAD * len(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL)) / len(sample)
+
+
+def _partition(key, partitions, depth):
+    # Salting with the depth re-spreads a partition that is repartitioned.
+    return hash((depth, key)) % partitions
+
+
+def hash_join(batches, build_batches, spec, budget, spill_dir, partitions=DEFAULT_PARTITIONS):
+    """
+    Joins the row batches `batches` (probe side) with `build_batches`
+    (build side) on the keys of `spec` (see join_plan). The build side is
+    hashed in memory; past `budget` bytes both sides are hash-partitioned
+    to disk and joined partition by partition (Grace hash join), so a
+    spilled join does not keep the probe side's row order.
+    """
+    left_key = _key_getter(spec["left"], spec["cast"])
+    right_key = _key_getter(spec["right"], spec["cast"])
+    drop, prefix = set(spec["right"]), spec["prefix"]
+
+    def payload(row):
+        # The right-hand keys equal the left ones; only the rest is added.
+        return {prefix + key: value for key, value in row.items() if key not in drop}
+
+    probe = ([(left_key(row), row) for row in batch] for batch in batches)
+    build = ([(right_key(row), payload(row)) for row in batch] for batch in build_batches)
+    return _join(probe, build, spec["how"], budget, spill_dir, partitions)
+
+
+def _join(probe, build, how, budget, spill_dir, partitions, depth=0):
+    """Joins batches of (key, row) pairs; recurses into spilled partitions."""
+    table, used, spill = {}, 0.0, None
+    for batch in build:
+        if not batch:
+            continue
+        size = _row_bytes(batch)
+        for key, row in batch:
+            if key is None:
+                continue
+            if spill is not None:
+                spill.add(_partition(key, partitions, depth), (key, row))
+                continue
+            table.setdefault(key, []).append(row)
+            used += size
+            if used > budget:
+                if depth >= MAX_PARTITION_DEPTH:
+                    # Heavily skewed keys: the partition cannot be split further.
+                    logger.warning(f"⚠️ Join partition still over budget after {depth} levels; keeping it in memory.")
+                    used = float("-inf")
+                    continue
+                # Only the first spill is worth an info line; deeper levels are routine.
+                (logger.info if depth == 0 else logger.debug)(
+                    f"💽 Join build side over {budget / MB:.1f} MB; spilling to {partitions} partitions "
+                    f"(level {depth + 1}).")
+                spill = SpillPartitions(tempfile.mkdtemp(dir=spill_dir), "build", partitions)
+                for spilled_key, rows in table.items():
+                    index = _partition(spilled_key, partitions, depth)
+                    for spilled_row in rows:
+                        spill.add(index, (spilled_key, spilled_row))
+                table = {}
+
+    if spill is None:
+        yield from _probe(probe, table, how)
+        return
+
+    spill.close()
+    probe_spill = SpillPartitions(tempfile.mkdtemp(dir=spill_dir), "probe", partitions)
+    try:
+        for batch in probe:
+            unmatched = []
+            for key, row in batch:
+                if key is not None:
+                    probe_spill.add(_partition(key, partitions, depth), (key, row))
+                elif how == "left":
+                    unmatched.append(row)
+            if unmatched:
+                yield unmatched
+        probe_spill.close()
+        for index in range(partitions):
+            if probe_spill.rows[index]:
+                yield from _join(probe_spill.replay(index), spill.replay(index), how, budget,
+                                 spill_dir, partitions, depth + 1)
+    finally:
+        spill.remove()
+        probe_spill.remove()
+
+
+def _probe(probe, table, how):
+    for batch in probe:
+        output = []
+        for key, row in batch:
+            matches = table.get(key) if key is not None else None
+            if matches:
+                for match in matches:
+                    output.append({**row, **match})
+            elif how == "left":
+                output.append(row)
+        if output:
+            yield output
+
+
+def hash_aggregate(batches, group_by, aggregates, budget, spill_dir, partitions=DEFAULT_PARTITIONS):
+    """
+    Group-by aggregation over row batches. Partial accumulators live in a
+    hash table; when it outgrows `budget` they are spilled to disk by
+    partition and merged partition by partition at the end, so first/last
+    keep their input order.
+    """
+    if len(group_by) > 1:
+        # Unlike join keys, null keys are still groups in an aggregation.
+        key_of = lambda row: tuple(row.get(column) for column in group_by)
+    elif group_by:
+        key_of = lambda row, column=group_by[0]: row.get(column)
+    else:
+        key_of = lambda row: None
+    steps = [(AGGREGATORS[function][1], column) for _, function, column in aggregates]
+    initial = [AGGREGATORS[function][0] for _, function, _ in aggregates]
+    merges = [AGGREGATORS[function][2] for _, function, _ in aggregates]
+    limit = max(1, int(budget // (GROUP_BYTES + 16 * len(aggregates))))
+
+    groups, spill = {}, None
+    for batch in batches:
+        for row in batch:
+            key = key_of(row)
+            state = groups.get(key)
+            if state is None:
+                if len(groups) >= limit:
+                    if spill is None:
+                        logger.info(f"💽 Aggregation over {budget / MB:.1f} MB ({len(groups):,} groups); "
+                                    f"spilling partial results to {partitions} partitions.")
+                        spill = SpillPartitions(tempfile.mkdtemp(dir=spill_dir), "groups", partitions)
+                    _spill_groups(groups, spill, partitions)
+                state = groups[key] = list(initial)
+            for index, (step, column) in enumerate(steps):
+                value = True if column is None else row.get(column)
+                if value is not None:
+                    state[index] = step(state[index], value)
+
+    if spill is None:
+        yield from _emit(groups, group_by, aggregates)
+        return
+
+    _spill_groups(groups, spill, partitions)
+    spill.close()
+    try:
+        for index in range(partitions):
+            merged = {}
+            for batch in spill.replay(index):
+                for key, state in batch:
+                    current = merged.get(key)
+                    if current is None:
+                        merged[key] = state
+                    else:
+                        merged[key] = [merge(a, b) for merge, a, b in zip(merges, current, state)]
+            yield from _emit(merged, group_by, aggregates)
+    finally:
+        spill.remove()
+
+
+def _spill_groups(groups, spill, partitions):
+    for key, state in groups.items():
+        spill.add(_partition(key, partitions, 0), (key, state))
+    groups.clear()
+
+
+def _emit(groups, group_by, aggregates):
+    finals = [AGGREGATORS[function][3] for _, function, _ in aggregates]
+    outputs = [output for output, _, _ in aggregates]
+    batch = []
+    for key, state in groups.items():
+        row = dict(zip(group_by, key)) if len(group_by) > 1 else ({group_by[0]: key} if group_by else {})
+        for output, final, value in zip(outputs, finals, state):
+            row[output] = final(value) if final else value
+        batch.append(row)
+        if len(batch) >= OUTPUT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class JoinEngine:
+    """
+    Runs JOIN statements: hash joins and group-by aggregations over the
+    results of other statements (SQL, MONGO, FILES...), which the run spools
+    to disk and hands over as "_inputs". Both operators share the
+    statement's "memory_limit_mb" and spill to disk past it.
+    """
+
+    def __init__(self, manager=None):
+        # Joins read spooled results only; accepted for registry uniformity.
+        self.manager = manager
+
+    def execute(self, provider_type, statement):
+        if provider_type != "JOIN":
+            raise ValueError(f"Unsupported join provider: {provider_type}")
+        joins, group_by, aggregates = join_plan(statement)
+        inputs = statement.get("_inputs")
+        if not inputs or len(inputs) != len(joins) + 1:
+            raise ValueError("JOIN statements run inside `chester run`, after the statements they read.")
+
+        batches = self._run(statement, joins, group_by, aggregates, inputs)
+        if statement.get("stream"):
+            return batches
+        return [row for batch in batches for row in batch]
+
+    def fingerprint(self, provider_type, statement):
+        return None
+
+    @staticmethod
+    def _run(statement, joins, group_by, aggregates, inputs):
+        budget = float(statement.get("memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB)) * MB
+        partitions = int(statement.get("partitions", DEFAULT_PARTITIONS))
+        # Chained operators hold their tables at the same time.
+        share = budget / max(1, len(joins) + bool(group_by or aggregates))
+        spill_dir = tempfile.mkdtemp(prefix="chester-spill-", dir=os.getenv("CHESTER_SPILL_DIR"))
+        try:
+            batches = replay_batches(inputs[0])
+            for join, path in zip(joins, inputs[1:]):
+                batches = hash_join(batches, replay_batches(path), join, share, spill_dir, partitions)
+            if group_by or aggregates:
+                batches = hash_aggregate(batches, group_by, aggregates, share, spill_dir, partitions)
+            total = 0
+            for batch in batches:
+                total += len(batch)
+                yield batch
+            logger.info(f"🔗 Join produced {total} rows from {len(inputs)} inputs.")
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
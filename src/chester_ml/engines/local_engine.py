@@ -1,16 +1,127 @@
 from loguru import logger
-from chester_ml.providers.file_providers import FileProvider
+from chester_ml.utils.metrics import span
+from chester_ml.engines.split_extraction import run_splits
+from chester_ml.utils.query_rewriter import sample_spec, split_spec, sql_bounds_query, sql_split_queries, statement_sql
+from chester_ml.providers.file_providers import FileProvider, DEFAULT_CHUNK_SIZE
+
+PUSHDOWN_KEYS = ("columns", "limit", "sample")
 
 class LocalEngine:
-    """Handles local data sources: JSON, CSV, TXT."""
+    """Handles local data sources: JSON, NDJSON, CSV, TXT files and SQLite databases."""
+    def __init__(self, manager=None):
+        # Local sources hold no connections; accepted for registry uniformity.
+        self.manager = manager
+
     def execute(self, provider_type, statement):
         if provider_type == "FILES":
             return self._execute_file(statement)
+        elif provider_type == "SQLITE":
+            return self._execute_sqlite(statement)
         else:
             raise ValueError(f"Unsupported local provider: {provider_type}")
 
+    def fingerprint(self, provider_type, statement):
+        """Source fingerprint used by the result cache."""
+        if provider_type == "SQLITE":
+            return self._sqlite_controller(statement).fingerprint()
+        return self._file_provider(statement).fingerprint()
+
+    def reads_whole(self, provider_type, statement):
+        """
+        True when a FILES statement returns its JSON document as parsed: it is
+        loaded whole anyway, and reading it by batches would wrap an object
+        in a list.
+        """
+        return (provider_type == "FILES" and not any(key in statement for key in PUSHDOWN_KEYS)
+                and self._file_provider(statement).format == "json")
+
+    def _file_provider(self, statement):
+        return FileProvider(
+            statement["path"],
+            file_format=statement.get("format"),
+            encoding=statement.get("encoding", "utf-8"),
+            delimiter=statement.get("delimiter")
+        )
+
     def _execute_file(self, statement):
-        file = FileProvider(statement["path"])
-        file.connect()
-        data = file.read()
+        file = self._file_provider(statement)
+        with span("connect"):
+            file.connect()
+        chunk_size = int(statement.get("chunk_size", DEFAULT_CHUNK_SIZE))
+        if statement.get("stream"):
+            return self._stream_file(file, chunk_size, statement)
+        with span("fetch"):
+            if any(key in statement for key in PUSHDOWN_KEYS):
+                return [record for batch in self._select(file, chunk_size, statement) for record in batch]
+            data = file.read()
         return data
+
+    @staticmethod
+    def _select(file, chunk_size, statement):
+        """Projection, sampling and limit applied while the file is read."""
+        return file.select_batches(chunk_size, statement.get("columns"), statement.get("limit"),
+                                   sample_spec(statement))
+
+    def _stream_file(self, file, chunk_size, statement):
+        """Yields record batches for a statement flagged with "stream": true."""
+        total = 0
+        for records in self._select(file, chunk_size, statement):
+            total += len(records)
+            yield records
+        logger.info(f"📊 File streamed {total} records from {file.filepath}.")
+
+    def _sqlite_controller(self, statement):
+        from chester_ml.providers.database_providers.sqlite_controller import SQLiteController
+        return SQLiteController(statement["path"])
+
+    def _execute_sqlite(self, statement):
+        query = statement.get("query")
+        if not query:
+            logger.warning("⚠️ No query found in SQLite statement.")
+            return None
+        if split_spec(statement):
+            substatements = self._sqlite_splits(statement)
+            return run_splits(statement, substatements, self._stream_sqlite,
+                              statement.get("split_workers") or len(substatements))
+        if statement.get("stream"):
+            return self._stream_sqlite(statement)
+
+        sqlite = self._sqlite_controller(statement)
+        try:
+            with span("connect"):
+                sqlite.connect()
+            with span("query"):
+                return sqlite.read(statement_sql(statement, "sqlite"), params=statement.get("params"))
+        finally:
+            sqlite.close()
+
+    def _sqlite_splits(self, statement):
+        """One statement per key range / modulo bucket of "split_by"."""
+        column, count, mode = split_spec(statement)
+        bounds = statement.get("split_bounds")
+        if mode == "range" and not bounds:
+            sqlite = self._sqlite_controller(statement)
+            try:
+                sqlite.connect()
+                rows = sqlite.read(sql_bounds_query(statement["query"], column), params=statement.get("params"))
+            finally:
+                sqlite.close()
+            bounds = (rows[0]["low"], rows[0]["high"]) if rows else None
+        queries = sql_split_queries(statement["query"], column, mode, count, bounds, "sqlite")
+        return [{**statement, "query": query} for query in queries]
+
+    def _stream_sqlite(self, statement):
+        """Yields row batches for a SQLite statement flagged with "stream": true."""
+        from chester_ml.providers.database_providers.sqlite_controller import DEFAULT_CHUNK_SIZE as SQLITE_CHUNK_SIZE
+        sqlite = self._sqlite_controller(statement)
+        chunk_size = int(statement.get("chunk_size", SQLITE_CHUNK_SIZE))
+        try:
+            with span("connect"):
+                sqlite.connect()
+            total = 0
+            for rows in sqlite.read_stream(statement_sql(statement, "sqlite"), chunk_size, params=statement.get("params")):
+                total += len(rows)
+                yield rows
+            logger.info(f"📊 SQLite query streamed {total} rows.")
+        finally:
+            sqlite.close()
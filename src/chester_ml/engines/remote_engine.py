@@ -1,15 +1,47 @@
 import os
 from dotenv import load_dotenv
 from loguru import logger
-from chester_ml.providers.database_providers.sql_controller import SQLController
-from chester_ml.providers.database_providers.mongo_controller import MongoController
+from chester_ml.utils.metrics import span
+from chester_ml.engines.split_extraction import run_splits
+from chester_ml.utils.query_rewriter import (
+    mongo_pushdown, mongo_split_filters, sample_spec, split_spec, sql_bounds_query, sql_split_queries, statement_sql
+)
+
+# Controllers are imported lazily so a SQL-only run never imports pymongo
+# (and vice versa).
+
+MONGO_FIND_OPTIONS = ("projection", "sort", "limit", "hint", "batch_size")
+
+
+def _mongo_options(statement):
+    """Cursor options declared by a Mongo statement; "timeout" becomes maxTimeMS."""
+    options = {k: statement[k] for k in MONGO_FIND_OPTIONS if k in statement}
+    if statement.get("timeout"):
+        options["max_time_ms"] = int(float(statement["timeout"]) * 1000)
+    return options
+
+
+def _mongo_plan(statement):
+    """
+    Resolves a Mongo statement into ("find", filter, options) or
+    ("aggregate", pipeline, options), pushing "columns", "limit" and
+    "sample" down to the server. Explicit cursor options win.
+    """
+    mode, query, options = mongo_pushdown(statement.get("filter", {}), statement.get("columns"),
+                                          statement.get("limit"), sample_spec(statement))
+    if mode == "aggregate":
+        if statement.get("timeout"):
+            options["max_time_ms"] = int(float(statement["timeout"]) * 1000)
+        return mode, query, options
+    return mode, query, {**options, **_mongo_options(statement)}
 
 
 class RemoteEngine:
     """Handles remote data sources: SQL, MongoDB, APIs."""
 
-    def __init__(self):
+    def __init__(self, manager=None):
         logger.debug("🔧 Initializing RemoteEngine...")
+        self.manager = manager
         load_dotenv()
         logger.debug("🌍 Environment variables loaded.")
 
@@ -29,28 +61,80 @@ class RemoteEngine:
             return None
 
 
-    def _execute_sql(self, statement):
+    def fingerprint(self, provider_type, statement):
+        """
+        Source fingerprint used by the result cache: the result of the
+        statement's optional "freshness_query" (a SQL query, or a Mongo
+        aggregation pipeline), e.g. SELECT MAX(updated_at) FROM orders.
+        """
+        freshness_query = statement.get("freshness_query")
+        if not freshness_query:
+            return None
+
+        if provider_type == "SQL":
+            controller = self._sql_controller()
+            controller.connect()
+            try:
+                rows = controller.read(freshness_query)
+                if rows is None:
+                    raise RuntimeError("freshness query failed")
+                return rows
+            finally:
+                controller.close()
+        if provider_type == "MONGO":
+            controller = self._mongo_controller(statement)
+            controller.connect()
+            try:
+                return controller.aggregate(freshness_query)
+            finally:
+                controller.close()
+        raise ValueError(f"Unsupported remote provider: {provider_type}")
+
+    def _sql_controller(self):
+        from chester_ml.providers.database_providers.sql_controller import SQLController
         logger.debug("🧩 Preparing SQL controller configuration...")
         sql = SQLController(
             host=os.getenv("SQL_HOST"),
             user=os.getenv("SQL_USER"),
             password=os.getenv("SQL_PASSWORD"),
-            database=os.getenv("SQL_DATABASE")
+            database=os.getenv("SQL_DATABASE"),
+            manager=self.manager
         )
         logger.debug(f"📦 SQL configuration: {sql.config}")
+        return sql
+
+    def _split_workers(self, statement, count):
+        # Beyond the pool size, partitions would only wait for a connection.
+        workers = statement.get("split_workers") or count
+        return min(int(workers), self.manager.pool_size) if self.manager else int(workers)
+
+    def _execute_sql(self, statement):
+        if split_spec(statement):
+            substatements = self._sql_splits(statement)
+            return run_splits(statement, substatements, self._stream_sql,
+                              self._split_workers(statement, len(substatements)))
+        if statement.get("stream"):
+            if not statement.get("query"):
+                logger.warning("⚠️ No query found in SQL statement.")
+                return None
+            return self._stream_sql(statement)
+
+        sql = self._sql_controller()
 
         try:
             logger.info("🔌 Connecting to SQL database...")
-            sql.connect()
+            with span("connect"):
+                sql.connect()
             logger.info("✅ SQL connection established.")
 
-            query = statement.get("query")
-            if not query:
+            if not statement.get("query"):
                 logger.warning("⚠️ No query found in SQL statement.")
                 return None
+            query = statement_sql(statement)
 
             logger.debug(f"▶️ Executing SQL query: {query}")
-            result = sql.read(query)
+            with span("query"):
+                result = sql.read(query, timeout=statement.get("timeout"), params=statement.get("params"))
 
             if result:
                 logger.info(f"📊 Query returned {len(result)} rows.")
@@ -67,25 +151,88 @@ class RemoteEngine:
             sql.close()
             logger.debug("🧩 SQL connection closed.")
 
+    def _sql_splits(self, statement):
+        """One statement per key range / MOD bucket of "split_by"."""
+        column, count, mode = split_spec(statement)
+        bounds = statement.get("split_bounds")
+        if mode == "range" and not bounds:
+            sql = self._sql_controller()
+            try:
+                with span("connect"):
+                    sql.connect()
+                with span("query"):
+                    rows = sql.read(sql_bounds_query(statement["query"], column), timeout=statement.get("timeout"),
+                                    params=statement.get("params"))
+            finally:
+                sql.close()
+            bounds = (rows[0]["low"], rows[0]["high"]) if rows else None
+            logger.debug(f"📏 Split bounds for {column}: {bounds}")
+        return [{**statement, "query": query} for query in sql_split_queries(statement["query"], column, mode, count, bounds)]
 
-    def _execute_mongo(self, statement):
+    def _stream_sql(self, statement):
+        """Yields row batches for a statement flagged with "stream": true."""
+        from chester_ml.providers.database_providers.sql_controller import DEFAULT_CHUNK_SIZE
+        sql = self._sql_controller()
+        chunk_size = int(statement.get("chunk_size", DEFAULT_CHUNK_SIZE))
+        query = statement_sql(statement)
+
+        try:
+            logger.info("🔌 Connecting to SQL database...")
+            with span("connect"):
+                sql.connect()
+            logger.info("✅ SQL connection established.")
+
+            logger.debug(f"▶️ Streaming SQL query in chunks of {chunk_size}: {query}")
+            total = 0
+            for rows in sql.read_stream(query, chunk_size, timeout=statement.get("timeout"),
+                                        params=statement.get("params")):
+                total += len(rows)
+                logger.debug(f"📦 Fetched chunk of {len(rows)} rows ({total} so far).")
+                yield rows
+
+            logger.info(f"📊 Query streamed {total} rows.")
+        finally:
+            logger.debug("🔒 Closing SQL connection...")
+            sql.close()
+            logger.debug("🧩 SQL connection closed.")
+
+
+    def _mongo_controller(self, statement):
+        from chester_ml.providers.database_providers.mongo_controller import MongoController
         logger.debug("🧩 Preparing MongoDB controller configuration...")
         mongo = MongoController(
             uri=os.getenv("MONGO_URI"),
             database=os.getenv("MONGO_DATABASE"),
-            collection=statement.get("collection", os.getenv("MONGO_COLLECTION"))
+            collection=statement.get("collection", os.getenv("MONGO_COLLECTION")),
+            manager=self.manager
         )
         logger.debug(f"📦 Mongo configuration: uri={mongo.uri}, db={mongo.database_name}, col={mongo.collection_name}")
+        return mongo
+
+    def _execute_mongo(self, statement):
+        if split_spec(statement):
+            substatements = self._mongo_splits(statement)
+            return run_splits(statement, substatements, self._stream_mongo,
+                              self._split_workers(statement, len(substatements)))
+        if statement.get("stream"):
+            return self._stream_mongo(statement)
+
+        mongo = self._mongo_controller(statement)
 
         try:
             logger.info("🔌 Connecting to MongoDB...")
-            mongo.connect()
+            with span("connect"):
+                mongo.connect()
             logger.info("✅ MongoDB connection established.")
 
-            filter_query = statement.get("filter", {})
-            logger.debug(f"▶️ Executing MongoDB query: {filter_query}")
+            mode, query, options = _mongo_plan(statement)
+            logger.debug(f"▶️ Executing MongoDB {mode}: {query} options={options}")
 
-            result = mongo.read(filter_query)
+            with span("query"):
+                if mode == "aggregate":
+                    result = mongo.aggregate(query, **options)
+                else:
+                    result = mongo.read(query, **options)
 
             if result:
                 logger.info(f"📊 Query returned {len(result)} documents.")
@@ -101,3 +248,52 @@ class RemoteEngine:
             logger.debug("🔒 Closing MongoDB connection...")
             mongo.close()
             logger.debug("🧩 MongoDB connection closed.")
+
+    def _mongo_splits(self, statement):
+        """One statement per key range / $mod bucket of "split_by"."""
+        key, count, mode = split_spec(statement)
+        bounds = statement.get("split_bounds")
+        if mode == "range" and not bounds:
+            mongo = self._mongo_controller(statement)
+            present = {key: {"$ne": None}}
+            if statement.get("filter"):
+                present = {"$and": [statement["filter"], present]}
+            try:
+                with span("connect"):
+                    mongo.connect()
+                with span("query"):
+                    first = mongo.read(present, projection={key: 1}, sort=[(key, 1)], limit=1)
+                    last = mongo.read(present, projection={key: 1}, sort=[(key, -1)], limit=1)
+            finally:
+                mongo.close()
+            bounds = (first[0].get(key), last[0].get(key)) if first and last else None
+            logger.debug(f"📏 Split bounds for {key}: {bounds}")
+        filters = mongo_split_filters(statement.get("filter", {}), key, mode, count, bounds)
+        return [{**statement, "filter": filter_query} for filter_query in filters]
+
+    def _stream_mongo(self, statement):
+        """Yields document batches for a statement flagged with "stream": true."""
+        from chester_ml.providers.database_providers.mongo_controller import DEFAULT_BATCH_SIZE
+        mongo = self._mongo_controller(statement)
+        mode, query, options = _mongo_plan(statement)
+        options["batch_size"] = int(options.get("batch_size", statement.get("batch_size", DEFAULT_BATCH_SIZE)))
+
+        try:
+            logger.info("🔌 Connecting to MongoDB...")
+            with span("connect"):
+                mongo.connect()
+            logger.info("✅ MongoDB connection established.")
+
+            logger.debug(f"▶️ Streaming MongoDB {mode}: {query} options={options}")
+            batches = mongo.aggregate_batches(query, **options) if mode == "aggregate" else mongo.read_batches(query, **options)
+            total = 0
+            for documents in batches:
+                total += len(documents)
+                logger.debug(f"📦 Fetched batch of {len(documents)} documents ({total} so far).")
+                yield documents
+
+            logger.info(f"📊 Query streamed {total} documents.")
+        finally:
+            logger.debug("🔒 Closing MongoDB connection...")
+            mongo.close()
+            logger.debug("🧩 MongoDB connection closed.")
@@ -0,0 +1,95 @@
+import contextvars
+import queue
+import threading
+from loguru import logger
+from chester_ml.utils import progress
+from chester_ml.utils.metrics import span
+
+# Batches buffered per worker before producers block (backpressure).
+QUEUE_BATCHES_PER_WORKER = 2
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def parallel_batches(producers, workers=None):
+    """
+    Runs the batch generators returned by `producers` (callables, one per
+    partition) on up to `workers` threads and yields their batches as they
+    arrive. The hand-off queue is bounded, so a slow consumer blocks the
+    readers instead of letting partitions pile up in memory. The first
+    error is re-raised here; closing the generator stops every worker.
+    """
+    workers = max(1, min(len(producers), int(workers or len(producers))))
+    pending = queue.Queue()
+    for producer in producers:
+        pending.put(producer)
+    results = queue.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    stop = threading.Event()
+    # Bytes reported by the controllers still count for the statement.
+    counter = progress.current()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def work():
+        progress.bind(counter)
+        try:
+            while not stop.is_set():
+                try:
+                    producer = pending.get_nowait()
+                except queue.Empty:
+                    return
+                batches = producer()
+                try:
+                    for batch in batches:
+                        if stop.is_set():
+                            return
+                        put(batch)
+                finally:
+                    if hasattr(batches, "close"):
+                        batches.close()
+        except Exception as e:
+            put(_Failure(e))
+        finally:
+            put(_DONE)
+
+    for index in range(workers):
+        threading.Thread(target=contextvars.copy_context().run, args=(work,), name=f"chester-split-{index}",
+                         daemon=True).start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            item = results.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+    finally:
+        stop.set()
+
+
+def run_splits(statement, substatements, stream, workers=None):
+    """
+    Executes the partition `substatements` of a split statement through
+    `stream` (an engine's streaming method) in parallel and merges their
+    batches: a stream for "stream": true statements, otherwise one list.
+    """
+    logger.info(f"🪓 Extracting in {len(substatements)} partitions on '{statement['split_by']}' "
+                f"with {min(len(substatements), int(workers or len(substatements)))} workers.")
+    batches = parallel_batches([lambda sub=sub: stream(sub) for sub in substatements], workers)
+    if statement.get("stream"):
+        return batches
+    with span("fetch"):
+        return [row for batch in batches for row in batch]
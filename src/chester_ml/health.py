@@ -0,0 +1,174 @@
+import math
+import os
+import threading
+import time
+from loguru import logger
+from chester_ml.utils.stats import summarize
+
+DEFAULT_DEADLINE = 5.0
+READ_PROBE_BYTES = 4096
+
+
+class ProbeTarget:
+    """
+    Un destino a comprobar. sample(timeout) hace una conexión nueva y un
+    round-trip, y devuelve (segundos de conexión, segundos de round-trip);
+    lanza una excepción si falla.
+    """
+
+    def __init__(self, kind, name, sample):
+        self.kind = kind
+        self.name = name
+        self.sample = sample
+        self.connect = []
+        self.rtt = []
+        self.errors = 0
+        self.error = None
+        self.done = False
+
+
+def _sql_sample(config):
+    def sample(timeout):
+        import mysql.connector
+        start = time.perf_counter()
+        connection = mysql.connector.connect(**config, connection_timeout=max(1, math.ceil(timeout)))
+        connected = time.perf_counter()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return connected - start, time.perf_counter() - connected
+        finally:
+            connection.close()
+    return sample
+
+
+def _mongo_sample(uri):
+    def sample(timeout):
+        from pymongo import MongoClient
+        timeout_ms = max(100, int(timeout * 1000))
+        start = time.perf_counter()
+        client = MongoClient(uri, serverSelectionTimeoutMS=timeout_ms, connectTimeoutMS=timeout_ms)
+        try:
+            # The first ping pays for server selection and the handshake.
+            client.admin.command("ping")
+            connected = time.perf_counter()
+            client.admin.command("ping")
+            return connected - start, time.perf_counter() - connected
+        finally:
+            client.close()
+    return sample
+
+
+def _file_sample(path):
+    def sample(timeout):
+        start = time.perf_counter()
+        with open(path, "rb") as file:
+            opened = time.perf_counter()
+            file.read(READ_PROBE_BYTES)
+            return opened - start, time.perf_counter() - opened
+    return sample
+
+
+def configured_targets(local_statements=None):
+    """
+    Destinos configurados: SQL y Mongo si sus variables de entorno existen, y
+    cada ruta ("path") declarada en los statements locales.
+    """
+    targets = []
+    if os.getenv("SQL_HOST"):
+        config = {
+            "host": os.getenv("SQL_HOST"),
+            "user": os.getenv("SQL_USER"),
+            "password": os.getenv("SQL_PASSWORD"),
+            "database": os.getenv("SQL_DATABASE")
+        }
+        targets.append(ProbeTarget("SQL", config["host"], _sql_sample(config)))
+    if os.getenv("MONGO_URI"):
+        targets.append(ProbeTarget("MONGO", os.getenv("MONGO_DATABASE") or "mongo", _mongo_sample(os.getenv("MONGO_URI"))))
+
+    paths = []
+    for provider, statements in (local_statements or {}).items():
+        for statement in statements.values():
+            path = statement.get("path") if isinstance(statement, dict) else None
+            if path and path not in paths:
+                paths.append(path)
+                targets.append(ProbeTarget(provider, path, _file_sample(path)))
+    return targets
+
+
+def run_probes(targets, samples=1, deadline=DEFAULT_DEADLINE):
+    """
+    Sondea todos los destinos en paralelo, `samples` veces cada uno, con un
+    único plazo total: cada intento recibe como timeout lo que queda del
+    plazo y los destinos que no terminan a tiempo se abandonan (hilos daemon).
+    """
+    end = time.monotonic() + deadline
+
+    def probe(target):
+        for _ in range(samples):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                connect, rtt = target.sample(remaining)
+                target.connect.append(connect)
+                target.rtt.append(rtt)
+            except Exception as e:
+                target.errors += 1
+                target.error = str(e)
+        target.done = True
+
+    threads = [
+        threading.Thread(target=probe, args=(target,), name=f"chester-probe-{target.kind}", daemon=True)
+        for target in targets
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0, end - time.monotonic()))
+
+    return [_report(target, samples) for target in targets]
+
+
+def _report(target, samples):
+    connect, rtt = list(target.connect), list(target.rtt)
+    if not connect:
+        status = "failed" if target.done else "timeout"
+    elif target.errors or len(connect) < samples:
+        status = "degraded"
+    else:
+        status = "ok"
+    return {
+        "kind": target.kind,
+        "name": target.name,
+        "status": status,
+        "samples": len(connect),
+        "errors": target.errors,
+        "error": target.error,
+        "connect_ms": summarize(s * 1000 for s in connect),
+        "rtt_ms": summarize(s * 1000 for s in rtt)
+    }
+
+
+STATUS_ICONS = {"ok": "✅", "degraded": "⚠️", "failed": "❌", "timeout": "⏱️"}
+
+
+def log_reports(reports):
+    for report in reports:
+        line = f"{STATUS_ICONS[report['status']]} {report['kind']:<6} {report['name']}: {report['status'].upper()}"
+        if report["samples"]:
+            connect, rtt = report["connect_ms"], report["rtt_ms"]
+            line += (f" — connect p50 {connect['p50']:.2f}ms p90 {connect['p90']:.2f}ms max {connect['max']:.2f}ms"
+                     f" | rtt p50 {rtt['p50']:.2f}ms p90 {rtt['p90']:.2f}ms max {rtt['max']:.2f}ms"
+                     f" ({report['samples']} samples)")
+        if report["error"]:
+            line += f" — last error: {report['error']}"
+
+        if report["status"] == "ok":
+            logger.info(line)
+        elif report["status"] == "degraded":
+            logger.warning(line)
+        else:
+            logger.error(line)
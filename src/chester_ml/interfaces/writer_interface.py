@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+class WriterInterface(ABC):
+    """
+    Base interface for result writers used by execute_providers.
+    Writers receive each statement as an iterable of row batches so results
+    can be persisted as they arrive, possibly from several threads at once.
+    """
+    @abstractmethod
+    def write_statement(self, provider, name, batches):
+        """
+        Persists every row of `batches` under provider/name.
+        Returns the number of rows written.
+        """
+        pass
+
+    @abstractmethod
+    def discard(self, provider, name):
+        """Removes a statement that failed or timed out from the output."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Flushes and finalizes the output."""
+        pass
@@ -0,0 +1,41 @@
+from chester_ml.utils import progress
+from chester_ml.utils.query_rewriter import sql_insert, sql_row_values
+from loguru import logger
+
+DEFAULT_WRITE_BATCH_SIZE = 1000
+
+
+class BulkWriter:
+    """
+    executemany-based bulk inserts for DB-API controllers. The controller
+    provides `connection`, `cursor` and its sql_insert `dialect`.
+    """
+
+    dialect = "mysql"
+
+    def write_batches(self, table, batches, batch_size=DEFAULT_WRITE_BATCH_SIZE, mode="insert", columns=None):
+        """
+        Bulk-inserts row dicts from `batches` into `table` with executemany,
+        committing every `batch_size` rows so a failure only rolls back the
+        chunk in flight. Columns default to the keys of the first row.
+        Returns the number of rows committed.
+        """
+        query = None
+        written = 0
+        for batch in batches:
+            for start in range(0, len(batch), batch_size):
+                chunk = batch[start:start + batch_size]
+                if query is None:
+                    columns = columns or list(chunk[0])
+                    query = sql_insert(table, columns, mode, self.dialect)
+                    logger.debug(f"▶️ Bulk insert statement: {query}")
+                try:
+                    self.cursor.executemany(query, sql_row_values(chunk, columns))
+                    self.connection.commit()
+                except Exception as e:
+                    self.connection.rollback()
+                    logger.error(f"❌ Bulk write failed after {written} committed rows: {e}")
+                    raise
+                written += len(chunk)
+                progress.current().add(rows=len(chunk))
+        return written
@@ -0,0 +1,82 @@
+import os
+import threading
+from loguru import logger
+
+DEFAULT_POOL_SIZE = 5
+
+
+class ConnectionManager:
+    """
+    Keeps database connections alive for a whole Chester run.
+
+    SQL connections come from one SQLAlchemy QueuePool per server config,
+    pinged on checkout so stale connections are replaced transparently.
+    Mongo statements share one MongoClient (and its internal pool) per URI.
+    Drivers are imported on first use, so runs that never touch a database
+    do not pay for them.
+    """
+
+    def __init__(self, pool_size=None):
+        self.pool_size = int(pool_size or os.getenv("CHESTER_POOL_SIZE", DEFAULT_POOL_SIZE))
+        self.sql_engines = {}
+        self.mongo_clients = {}
+        self.lock = threading.Lock()
+
+    def _sql_engine(self, config):
+        key = tuple(sorted((k, str(v)) for k, v in config.items()))
+        with self.lock:
+            engine = self.sql_engines.get(key)
+            if engine is None:
+                from sqlalchemy import create_engine
+                from sqlalchemy.engine import URL
+
+                url = URL.create(
+                    "mysql+mysqlconnector",
+                    username=config.get("user"),
+                    password=config.get("password"),
+                    host=config.get("host"),
+                    database=config.get("database")
+                )
+                engine = create_engine(
+                    url,
+                    pool_size=self.pool_size,
+                    max_overflow=0,
+                    pool_pre_ping=True
+                )
+                self.sql_engines[key] = engine
+                logger.debug(f"🏊 SQL pool created for {config.get('host')} (size={self.pool_size}).")
+        return engine
+
+    def sql_connection(self, config):
+        """Checks out a health-checked DB-API connection; close() returns it to the pool."""
+        return self._sql_engine(config).raw_connection()
+
+    def mongo_client(self, uri):
+        """Returns the shared MongoClient for `uri`, recreating it if a ping fails."""
+        with self.lock:
+            client = self.mongo_clients.get(uri)
+            if client is not None:
+                try:
+                    client.admin.command("ping")
+                    return client
+                except Exception as e:
+                    logger.warning(f"⚠️ Pooled MongoDB client failed health check, reconnecting: {e}")
+                    client.close()
+
+            from pymongo import MongoClient
+            client = MongoClient(uri, maxPoolSize=self.pool_size, serverSelectionTimeoutMS=2000)
+            self.mongo_clients[uri] = client
+            logger.debug(f"🏊 MongoDB client created for {uri} (maxPoolSize={self.pool_size}).")
+            return client
+
+    def close(self):
+        """Disposes every pool and client opened during the run."""
+        with self.lock:
+            for engine in self.sql_engines.values():
+                engine.dispose()
+            for client in self.mongo_clients.values():
+                client.close()
+            if self.sql_engines or self.mongo_clients:
+                logger.info("🔒 Connection pools closed.")
+            self.sql_engines.clear()
+            self.mongo_clients.clear()
@@ -1,14 +1,17 @@
 from pymongo import MongoClient
 from chester_ml.interfaces.provider_interface import ProviderInterface
+from chester_ml.utils import progress
 from loguru import logger
-from chester_ml.utils.logger_controller import dynamic_log
+
+DEFAULT_BATCH_SIZE = 5000
 
 
 class MongoController(ProviderInterface):
-    def __init__(self, uri, database, collection):
+    def __init__(self, uri, database, collection, manager=None):
         self.uri = uri
         self.database_name = database
         self.collection_name = collection
+        self.manager = manager
         self.client = None
         self.collection = None
 
@@ -23,30 +26,91 @@ class MongoController(ProviderInterface):
             return False
 
     def connect(self):
-        """Establish a MongoDB connection with visual feedback."""
+        """Establish a MongoDB connection."""
         logger.debug(f"Preparing to connect to MongoDB at {self.uri} "
                      f"(DB: {self.database_name}, Collection: {self.collection_name})")
 
-        dynamic_log("   ", f"Connecting to MongoDB at {self.uri} ...")
-
         try:
-            self.client = MongoClient(self.uri, serverSelectionTimeoutMS=2000)
+            if self.manager:
+                self.client = self.manager.mongo_client(self.uri)
+            else:
+                self.client = MongoClient(self.uri, serverSelectionTimeoutMS=2000)
             self.collection = self.client[self.database_name][self.collection_name]
             logger.success("✅ MongoDB connection established.")
         except Exception as e:
             logger.error(f"❌ MongoDB connection failed: {e}")
 
-    def read(self, query=None):
-        """Read documents with dynamic progress feedback."""
-        dynamic_log("   ", f"Reading data from collection '{self.collection_name}' ...")
+    def _find(self, query=None, projection=None, sort=None, limit=None, hint=None, batch_size=None,
+              max_time_ms=None):
+        """Builds a cursor with the optional statement-level find options."""
+        cursor = self.collection.find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(list(sort.items()) if isinstance(sort, dict) else [tuple(s) for s in sort])
+        if limit:
+            cursor = cursor.limit(int(limit))
+        if hint:
+            cursor = cursor.hint(list(hint.items()) if isinstance(hint, dict) else hint)
+        if batch_size:
+            cursor = cursor.batch_size(int(batch_size))
+        if max_time_ms:
+            cursor = cursor.max_time_ms(int(max_time_ms))
+        return cursor
+
+    def read(self, query=None, **options):
+        """Read documents into a list."""
+        logger.debug(f"Reading data from collection '{self.collection_name}' ...")
         try:
-            data = list(self.collection.find(query or {}))
+            data = list(self._find(query, **options))
             logger.success(f"✅ Retrieved {len(data)} records from MongoDB collection '{self.collection_name}'.")
             return data
         except Exception as e:
             logger.error(f"❌ Error reading from MongoDB: {e}")
             return None
 
+    def read_batches(self, query=None, batch_size=DEFAULT_BATCH_SIZE, **options):
+        """
+        Yields lists of at most `batch_size` documents, fetching from the server
+        in batches of the same size so only one batch is resident at a time.
+        """
+        cursor = self._find(query, batch_size=batch_size, **options)
+        try:
+            batch = []
+            for document in cursor:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        except Exception as e:
+            logger.error(f"❌ Error reading from MongoDB: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    def aggregate(self, pipeline, max_time_ms=None):
+        """Runs an aggregation pipeline and returns its documents."""
+        options = {"maxTimeMS": int(max_time_ms)} if max_time_ms else {}
+        return list(self.collection.aggregate(pipeline, **options))
+
+    def aggregate_batches(self, pipeline, batch_size=DEFAULT_BATCH_SIZE, max_time_ms=None):
+        """Yields the documents of an aggregation pipeline in lists of at most `batch_size`."""
+        options = {"batchSize": int(batch_size)}
+        if max_time_ms:
+            options["maxTimeMS"] = int(max_time_ms)
+        cursor = self.collection.aggregate(pipeline, **options)
+        try:
+            batch = []
+            for document in cursor:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            cursor.close()
+
     def write(self, data):
         """Write one or many documents to the collection."""
         try:
@@ -58,8 +122,41 @@ class MongoController(ProviderInterface):
         except Exception as e:
             logger.error(f"❌ Error writing to MongoDB: {e}")
 
+    def write_batches(self, batches, batch_size=DEFAULT_BATCH_SIZE, key=None):
+        """
+        Bulk-writes documents from `batches` in chunks of `batch_size` with
+        unordered operations, so one bad document does not stop the rest.
+        Without `key` documents are inserted (insert_many); with it they are
+        upserted by that field (bulk_write of ReplaceOne). Returns the number
+        of documents written.
+        """
+        from pymongo import ReplaceOne
+        from pymongo.errors import BulkWriteError
+
+        written = 0
+        for batch in batches:
+            for start in range(0, len(batch), batch_size):
+                chunk = batch[start:start + batch_size]
+                try:
+                    if key:
+                        result = self.collection.bulk_write(
+                            [ReplaceOne({key: doc.get(key)}, doc, upsert=True) for doc in chunk],
+                            ordered=False
+                        )
+                        count = result.upserted_count + result.matched_count
+                    else:
+                        count = len(self.collection.insert_many(chunk, ordered=False).inserted_ids)
+                except BulkWriteError as e:
+                    details = e.details
+                    count = details.get("nInserted", 0) + details.get("nUpserted", 0) + details.get("nMatched", 0)
+                    logger.warning(f"⚠️ {len(details.get('writeErrors', []))} documents rejected in bulk write: "
+                                   f"{details.get('writeErrors', [{}])[0].get('errmsg')}")
+                written += count
+                progress.current().add(rows=count)
+        return written
+
     def close(self):
-        """Close the MongoDB client connection."""
-        if self.client:
+        """Close the MongoDB client connection (shared pooled clients stay open)."""
+        if self.client and not self.manager:
             self.client.close()
             logger.info("🔒 MongoDB connection closed.")
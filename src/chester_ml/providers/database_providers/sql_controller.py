@@ -1,15 +1,22 @@
 import mysql.connector
 from chester_ml.interfaces.provider_interface import ProviderInterface
+from chester_ml.providers.database_providers.bulk_writer import BulkWriter
 from loguru import logger
 
-class SQLController(ProviderInterface):
-    def __init__(self, host, user, password, database):
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class SQLController(BulkWriter, ProviderInterface):
+    dialect = "mysql"
+
+    def __init__(self, host, user, password, database, manager=None):
         self.config = {
             "host": host,
             "user": user,
             "password": password,
             "database": database
         }
+        self.manager = manager
         self.connection = None
         self.cursor = None
 
@@ -24,22 +31,62 @@ class SQLController(ProviderInterface):
 
     def connect(self):
         try:
-            logger.debug(f"Connecting to SQL with config: {self.config}")
-            self.connection = mysql.connector.connect(**self.config)
+            if self.manager:
+                logger.debug(f"Checking out pooled SQL connection for: {self.config['host']}")
+                self.connection = self.manager.sql_connection(self.config)
+            else:
+                logger.debug(f"Connecting to SQL with config: {self.config}")
+                self.connection = mysql.connector.connect(**self.config)
             self.cursor = self.connection.cursor(dictionary=True)
             logger.info("✅ SQL connection established.")
         except Exception as e:
             logger.error(f"❌ SQL connection failed 11: {e}")
 
 
-    def read(self, query):
+    def _set_timeout(self, timeout):
+        """Caps SELECT execution server-side via MAX_EXECUTION_TIME (0 disables it)."""
+        self.cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(timeout * 1000) if timeout else 0,))
+
+    def read(self, query, timeout=None, params=None):
         try:
-            self.cursor.execute(query)
+            if timeout:
+                self._set_timeout(timeout)
+            self.cursor.execute(query, params)
             results = self.cursor.fetchall()
             return results
         except Exception as e:
             logger.error(f"Error executing query: {e}")
             return None
+        finally:
+            if timeout:
+                self._set_timeout(None)
+
+    def read_stream(self, query, chunk_size=DEFAULT_CHUNK_SIZE, timeout=None, params=None):
+        """
+        Streams the result of `query` as row batches of at most `chunk_size` rows.
+
+        Uses an unbuffered cursor so rows stay on the server until fetched;
+        only one batch is held in memory at a time.
+        """
+        if timeout:
+            self._set_timeout(timeout)
+        cursor = self.connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            raise
+        finally:
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+            if timeout:
+                self._set_timeout(None)
 
     def write(self, query):
         try:
@@ -53,4 +100,7 @@ class SQLController(ProviderInterface):
         if self.connection:
             self.cursor.close()
             self.connection.close()
-            logger.info("🔒 SQL connection closed.")
+            if self.manager:
+                logger.debug("🔁 SQL connection returned to pool.")
+            else:
+                logger.info("🔒 SQL connection closed.")
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+from chester_ml.interfaces.provider_interface import ProviderInterface
+from chester_ml.providers.database_providers.bulk_writer import BulkWriter
+from loguru import logger
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class SQLiteController(BulkWriter, ProviderInterface):
+    """
+    SQL provider backed by a local SQLite file. Mirrors SQLController
+    (dict rows, chunked read_stream) so it can stand in for a SQL server
+    in benchmarks and offline runs without any external service.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+        self.cursor = None
+
+    def test_connection(self):
+        if not os.path.isfile(self.path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute("SELECT 1")
+            conn.close()
+            return True
+        except Exception:
+            return False
+
+    def fingerprint(self):
+        """Cheap change detector for the result cache: mtime and size."""
+        stat = os.stat(self.path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def connect(self):
+        try:
+            logger.debug(f"Opening SQLite database: {self.path}")
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.cursor = self.connection.cursor()
+            logger.info("✅ SQLite connection established.")
+        except Exception as e:
+            logger.error(f"❌ SQLite connection failed: {e}")
+
+    def _columns(self):
+        return [column[0] for column in self.cursor.description or ()]
+
+    def read(self, query, params=None):
+        try:
+            self.cursor.execute(query, params or ())
+            columns = self._columns()
+            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            return None
+
+    def read_stream(self, query, chunk_size=DEFAULT_CHUNK_SIZE, params=None):
+        """Yields lists of at most `chunk_size` dict rows."""
+        self.cursor.execute(query, params or ())
+        columns = self._columns()
+        while True:
+            rows = self.cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+
+    def write(self, query):
+        try:
+            self.cursor.execute(query)
+            self.connection.commit()
+            logger.info("✅ Query executed successfully.")
+        except Exception as e:
+            logger.error(f"Error executing write query: {e}")
+
+    def close(self):
+        if self.connection:
+            self.cursor.close()
+            self.connection.close()
+            logger.info("🔒 SQLite connection closed.")
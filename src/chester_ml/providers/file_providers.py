@@ -1,35 +1,188 @@
+import csv
 import json
+import mmap
 import os
+import random
 from chester_ml.interfaces.provider_interface import ProviderInterface
+from chester_ml.utils import progress
 from loguru import logger
 
+DEFAULT_CHUNK_SIZE = 10000
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+FORMAT_EXTENSIONS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".txt": "txt"
+}
+
+
+def detect_format(filepath, file_format=None):
+    """Resolves the file format from an explicit value or the file extension."""
+    if file_format:
+        return file_format.lower()
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filepath)[1].lower(), "json")
+
+
 class FileProvider(ProviderInterface):
-    def __init__(self, filepath):
+    def __init__(self, filepath, file_format=None, encoding="utf-8", delimiter=None):
         self.filepath = filepath
+        self.format = detect_format(filepath, file_format)
+        self.encoding = encoding
+        self.delimiter = delimiter or ("\t" if filepath.lower().endswith(".tsv") else ",")
 
     def test_connection(self):
         try:
-            return os.path.exists(self.path)
+            return os.path.isfile(self.filepath) and os.access(self.filepath, os.R_OK)
         except Exception:
             return False
 
 
+    def fingerprint(self):
+        """Cheap change detector for the result cache: mtime and size."""
+        stat = os.stat(self.filepath)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
     def connect(self):
         if os.path.exists(self.filepath):
-            logger.info(f"📂 File ready: {self.filepath}")
+            logger.info(f"📂 File ready: {self.filepath} ({self.format})")
         else:
             logger.warning(f"⚠️ File not found: {self.filepath}")
 
     def read(self, _=None):
         try:
-            with open(self.filepath, "r", encoding="utf-8") as file:
-                data = json.load(file)
+            if self.format == "json":
+                with open(self.filepath, "r", encoding=self.encoding) as file:
+                    data = json.load(file)
+                progress.current().add(nbytes=os.path.getsize(self.filepath))
+            else:
+                data = [record for batch in self.read_batches() for record in batch]
             logger.info(f"✅ File read successfully: {self.filepath}")
             return data
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             return None
 
+    def read_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yields lists of at most `chunk_size` records.
+
+        CSV rows become dicts keyed by the header, NDJSON lines are decoded one
+        by one and TXT lines become {"line": text}. JSON documents have to be
+        parsed whole; a top-level array is then sliced into batches.
+        """
+        if self.format == "json":
+            with open(self.filepath, "r", encoding=self.encoding) as file:
+                data = json.load(file)
+            progress.current().add(nbytes=os.path.getsize(self.filepath))
+            records = data if isinstance(data, list) else [data]
+            for start in range(0, len(records), chunk_size):
+                yield records[start:start + chunk_size]
+            return
+
+        readers = {
+            "csv": self._csv_records,
+            "ndjson": self._ndjson_records,
+            "txt": self._txt_records
+        }
+        if self.format not in readers:
+            raise ValueError(f"Unsupported file format: {self.format}")
+
+        batch = []
+        for record in readers[self.format]():
+            batch.append(record)
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def select_batches(self, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, limit=None, sample=None):
+        """
+        read_batches() with projection, sampling and a row limit applied while
+        reading. `sample` is ("fraction", f, seed) for Bernoulli sampling or
+        ("count", n, seed) for reservoir sampling (Algorithm R), which keeps
+        only n records in memory. A limit stops reading the file early.
+        """
+        generator = random.Random(sample[2] if sample else None)
+        if sample and sample[0] == "count":
+            limit = min(int(limit), sample[1]) if limit else sample[1]
+
+        def project(record):
+            if columns and isinstance(record, dict):
+                return {column: record.get(column) for column in columns}
+            return record
+
+        batches = self.read_batches(chunk_size)
+        try:
+            if sample and sample[0] == "count":
+                reservoir, seen = [], 0
+                for batch in batches:
+                    for record in batch:
+                        if seen < limit:
+                            reservoir.append(project(record))
+                        else:
+                            slot = generator.randint(0, seen)
+                            if slot < limit:
+                                reservoir[slot] = project(record)
+                        seen += 1
+                for start in range(0, len(reservoir), chunk_size):
+                    yield reservoir[start:start + chunk_size]
+                return
+
+            remaining = int(limit) if limit else None
+            for batch in batches:
+                if sample:
+                    batch = [record for record in batch if generator.random() < sample[1]]
+                if remaining is not None:
+                    batch = batch[:remaining]
+                    remaining -= len(batch)
+                if batch:
+                    yield [project(record) for record in batch] if columns else batch
+                if remaining == 0:
+                    return
+        finally:
+            batches.close()
+
+    def _lines(self):
+        """
+        Iterates decoded lines (with line endings). Files above MMAP_THRESHOLD
+        are read through mmap so the OS pages them in lazily. Bytes read are
+        reported to the current progress counter.
+        """
+        counter = progress.current()
+        if os.path.getsize(self.filepath) < MMAP_THRESHOLD:
+            with open(self.filepath, "r", encoding=self.encoding, newline="") as file:
+                for line in file:
+                    counter.bytes += len(line)
+                    yield line
+            return
+
+        with open(self.filepath, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            logger.debug(f"🗺️ Reading {self.filepath} through mmap.")
+            for raw in iter(mapped.readline, b""):
+                counter.bytes += len(raw)
+                yield raw.decode(self.encoding)
+
+    def _csv_records(self):
+        lines = self._lines()
+        first = next(lines, "").lstrip("\ufeff")
+        reader = csv.DictReader(_prepend(first, lines), delimiter=self.delimiter)
+        yield from reader
+
+    def _ndjson_records(self):
+        for line in self._lines():
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+    def _txt_records(self):
+        for line in self._lines():
+            yield {"line": line.rstrip("\r\n")}
+
     def write(self, data):
         try:
             with open(self.filepath, "w", encoding="utf-8") as file:
@@ -40,3 +193,9 @@ class FileProvider(ProviderInterface):
 
     def close(self):
         logger.debug("🧾 File provider does not require close operation.")
+
+
+def _prepend(first, lines):
+    if first:
+        yield first
+    yield from lines
@@ -0,0 +1,100 @@
+import importlib
+import threading
+from loguru import logger
+
+ENTRY_POINT_GROUP = "chester_ml.providers"
+
+
+class ProviderSpec:
+    """
+    Describes a data provider without importing it.
+
+    name    → CLI name (sql, mongo, files...)
+    section → key of its statements in the universe files (SQL, MONGO...)
+    context → "remote" or "local", i.e. which universe files hold them
+    engine  → "module:Class" of the engine that executes its statements;
+              it is constructed with the run's ConnectionManager.
+    """
+
+    def __init__(self, name, section, context, engine):
+        self.name = name
+        self.section = section
+        self.context = context
+        self.engine = engine
+
+    def load_engine(self):
+        return load_object(self.engine)
+
+
+_providers = {}
+_lock = threading.Lock()
+_plugins_loaded = False
+
+
+def load_object(path):
+    """Imports "package.module:Attribute" on demand."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def register_provider(name, section, context, engine):
+    """
+    Registers a provider. Third-party packages can call this directly or
+    expose a dict {"section", "context", "engine"} under the
+    "chester_ml.providers" entry point group, named after the provider.
+    """
+    if context not in ("remote", "local"):
+        raise ValueError(f"Invalid context '{context}' for provider '{name}'. Use 'remote' or 'local'.")
+    with _lock:
+        _providers[name.lower()] = ProviderSpec(name.lower(), section.upper(), context, engine)
+
+
+def _load_plugins():
+    """Loads entry point plugins once; only needed for names not built in."""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    from importlib.metadata import entry_points
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            spec = entry_point.load()
+            register_provider(entry_point.name, spec["section"], spec["context"], spec["engine"])
+            logger.debug(f"🔌 Provider plugin registered: {entry_point.name} ({entry_point.value})")
+        except Exception as e:
+            logger.error(f"❌ Failed to load provider plugin '{entry_point.name}': {e}")
+
+
+def get_provider(name):
+    name = name.lower()
+    if name not in _providers:
+        _load_plugins()
+    if name not in _providers:
+        raise KeyError(f"Unknown provider '{name}'. Available: {', '.join(available_providers())}")
+    return _providers[name]
+
+
+def get_section(section):
+    """Spec of the provider whose statements live under `section` (SQL, FILES...)."""
+    section = section.upper()
+    for spec in list(_providers.values()):
+        if spec.section == section:
+            return spec
+    _load_plugins()
+    for spec in list(_providers.values()):
+        if spec.section == section:
+            return spec
+    raise KeyError(f"No provider registered for section '{section}'.")
+
+
+def available_providers():
+    _load_plugins()
+    return list(_providers)
+
+
+register_provider("sql", "SQL", "remote", "chester_ml.engines.remote_engine:RemoteEngine")
+register_provider("mongo", "MONGO", "remote", "chester_ml.engines.remote_engine:RemoteEngine")
+register_provider("files", "FILES", "local", "chester_ml.engines.local_engine:LocalEngine")
+register_provider("sqlite", "SQLITE", "local", "chester_ml.engines.local_engine:LocalEngine")
+register_provider("join", "JOIN", "local", "chester_ml.engines.join_engine:JoinEngine")
@@ -0,0 +1,283 @@
+import hmac
+import json
+import os
+import secrets
+import signal
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+from dotenv import load_dotenv
+
+from chester_ml.client import LOOPBACK, SOCKET_FILE, TOKEN_FILE, daemon_health, inside, state_path
+from chester_ml.core import OUTPUT_WRITERS, execute_providers
+from chester_ml.providers.database_providers.connection_manager import ConnectionManager
+from chester_ml.providers.registry import available_providers, get_provider, load_object
+from chester_ml.utils.catalog import CatalogError, load_catalog
+from chester_ml.utils.logger_controller import active_levels, base_level
+from chester_ml.utils.result_cache import ResultCache
+from chester_ml.writers.encoding import encode
+
+# Opciones de execute_providers que puede fijar una petición; el pool, la
+# caché, las métricas y el directorio de universos pertenecen al daemon.
+RUN_OPTIONS = (
+    "output_path", "workers", "provider_workers", "timeout", "output_format", "compression",
+    "use_cache", "refresh_cache", "reset_watermarks", "as_dataset", "fail_fast", "memory_limit_mb"
+)
+RESULT_BATCH_ROWS = 1000
+
+
+class ChesterDaemon:
+    """
+    Estado que `chester serve` mantiene caliente entre ejecuciones: el
+    ConnectionManager (pools SQL/Mongo ya abiertos), la ResultCache, el
+    catálogo de statements compilado y los motores y writers ya importados.
+    Las ejecuciones se atienden de una en una, en orden de llegada, para que
+    no compitan por las marcas de agua ni por los archivos de salida.
+    """
+
+    def __init__(self, pool_size=None, universe_dir="universes"):
+        self.manager = ConnectionManager(pool_size)
+        self.cache = None
+        try:
+            self.cache = ResultCache()
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache unavailable, running without it: {e}")
+        self.cwd = os.getcwd()
+        self.started = time.time()
+        self.runs = 0
+        self.running = None
+        self.run_lock = threading.Lock()
+        self._warm_up(universe_dir)
+
+    def _warm_up(self, universe_dir):
+        for name in available_providers():
+            try:
+                get_provider(name).load_engine()
+            except Exception as e:
+                logger.debug(f"Engine for {name} not preloaded: {e}")
+        for path in OUTPUT_WRITERS.values():
+            try:
+                load_object(path)
+            except Exception as e:
+                logger.debug(f"Writer {path} not preloaded: {e}")
+        if os.path.isdir(universe_dir):
+            try:
+                load_catalog(universe_dir)
+            except CatalogError as e:
+                logger.warning(f"⚠️ {e}")
+
+    def health(self):
+        return {
+            "service": "chester",
+            "pid": os.getpid(),
+            "cwd": self.cwd,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "runs": self.runs,
+            "running": self.running,
+            "pool_size": self.manager.pool_size
+        }
+
+    def run(self, request, emit):
+        """
+        Ejecuta una petición {"providers", "options", "log_levels",
+        "return_results"} y envía con emit() cada línea de log de la
+        ejecución ({"log": ...}), los resultados si se pidieron
+        ({"result": {...}}) y un cierre {"done": true, "ok": ...}.
+        """
+        run_id = uuid.uuid4().hex[:8]
+        # Igual que log_mode(): sin niveles válidos se muestra DEBUG.
+        levels = active_levels(request.get("log_levels")) or ["DEBUG"]
+        sink = logger.add(
+            lambda message: emit({"log": str(message)}),
+            level=base_level(levels),
+            filter=lambda record: record["extra"].get("run") == run_id and record["level"].name in levels,
+            colorize=False
+        )
+        options = {key: value for key, value in (request.get("options") or {}).items() if key in RUN_OPTIONS}
+        providers = request.get("providers") or ["all"]
+        ok = False
+        try:
+            with logger.contextualize(run=run_id), self.run_lock:
+                self.runs += 1
+                self.running = run_id
+                logger.debug(f"🛰️ Run {run_id}: {' '.join(providers)}")
+                try:
+                    results = execute_providers(providers, manager=self.manager, cache=self.cache, **options)
+                    if request.get("return_results"):
+                        _emit_results(results, emit)
+                    ok = True
+                except CatalogError:
+                    pass  # Cada problema ya se registró en el log de la ejecución.
+                except Exception as e:
+                    logger.error(f"❌ Run failed: {e}")
+                finally:
+                    self.running = None
+        finally:
+            logger.remove(sink)
+            emit({"done": True, "ok": ok})
+
+    def close(self):
+        self.manager.close()
+
+
+def _emit_results(results, emit):
+    for provider, statements in results.items():
+        for name, result in statements.items():
+            if hasattr(result, "iter_batches"):
+                batches = result.iter_batches(RESULT_BATCH_ROWS)
+            else:
+                rows = result if isinstance(result, list) else [result]
+                batches = (rows[start:start + RESULT_BATCH_ROWS] for start in range(0, len(rows), RESULT_BATCH_ROWS))
+            for batch in batches:
+                emit({"result": {"provider": provider, "statement": name, "rows": batch}})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "chester"
+
+    def _authorized(self):
+        """
+        Por TCP exige el token de daemon.json y un Host de loopback (contra
+        DNS rebinding); por el socket Unix basta con sus permisos 0600.
+        """
+        token = self.server.token
+        if token is None:
+            return True
+        host = (self.headers.get("Host") or "").rpartition(":")[0]
+        supplied = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if host in (LOOPBACK, "localhost") and hmac.compare_digest(supplied, token):
+            return True
+        self.send_error(403)
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != "/health":
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.chester.health()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/run":
+            self.send_error(404)
+            return
+        # Un navegador no puede enviar application/json sin preflight CORS.
+        if self.headers.get_content_type() != "application/json":
+            self.send_error(415, "Expected application/json")
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self.send_error(400, "Invalid JSON body")
+            return
+        output_path = (request.get("options") or {}).get("output_path")
+        if output_path and not inside(output_path, self.server.chester.cwd):
+            self.send_error(400, "output_path must be inside the daemon's directory")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        self.close_connection = True
+
+        lock = threading.Lock()
+
+        def emit(message):
+            # Statement threads log concurrently; the lines must not interleave.
+            line = (encode(message) + "\n").encode("utf-8")
+            with lock:
+                try:
+                    self.wfile.write(line)
+                    self.wfile.flush()
+                except OSError:
+                    pass  # The client went away; the run still completes.
+
+        self.server.chester.run(request, emit)
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(f"🛰️ {self.address_string()} {format % args}")
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _write_token(path, port, token):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump({"pid": os.getpid(), "port": port, "token": token}, file)
+
+
+def serve(port=None, socket_path=None, pool_size=None):
+    """
+    Arranca el daemon de `chester serve`: atiende GET /health y POST /run
+    hasta Ctrl+C o SIGTERM. `chester run` reenvía sus ejecuciones aquí cuando
+    el daemon sirve el mismo directorio, evitando el arranque del intérprete,
+    las importaciones y la apertura de conexiones en cada invocación. El .env
+    se lee una sola vez al arrancar.
+
+    Por defecto escucha en un socket Unix 0600 del directorio de estado
+    (socket_path lo cambia). Con port escucha solo en 127.0.0.1 y exige el
+    token aleatorio que guarda en daemon.json (0600) en cada petición. Las
+    salidas solo pueden escribirse dentro del directorio del daemon.
+    """
+    load_dotenv()
+    # No hay terminal al que dibujar la barra de progreso.
+    os.environ["CHESTER_PROGRESS"] = "0"
+
+    token_path = None
+    if port is None:
+        socket_path = socket_path or state_path(SOCKET_FILE)
+        os.environ["CHESTER_DAEMON_SOCKET"] = socket_path
+        if os.path.exists(socket_path):
+            if daemon_health():
+                logger.error(f"❌ A Chester daemon is already listening on {socket_path}.")
+                raise SystemExit(1)
+            os.remove(socket_path)  # Stale socket left by a daemon that died.
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        # The socket is created 0600, with no window where others could connect.
+        umask = os.umask(0o177)
+        try:
+            server = _UnixHTTPServer(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        server.token = None
+        address = socket_path
+    else:
+        if daemon_health():
+            logger.error("❌ A Chester daemon is already running for this directory.")
+            raise SystemExit(1)
+        server = ThreadingHTTPServer((LOOPBACK, port), _Handler)
+        server.token = secrets.token_urlsafe(32)
+        token_path = state_path(TOKEN_FILE)
+        _write_token(token_path, server.server_address[1], server.token)
+        address = f"http://{LOOPBACK}:{server.server_address[1]} (token in {token_path})"
+
+    server.chester = ChesterDaemon(pool_size)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    logger.success(f"🛰️ Chester daemon listening on {address} (pid {os.getpid()}, serving {server.chester.cwd})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.chester.close()
+        for path in (socket_path if port is None else None, token_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        logger.info("👋 Chester daemon stopped.")
@@ -0,0 +1,218 @@
+import json
+import os
+import time
+import numpy as np
+from loguru import logger
+from chester_ml.providers.registry import load_object
+from chester_ml.training.stream_trainer import INCREMENTAL_MODELS, MODELS_DIR
+from chester_ml.writers.numpy_writer import load_columns, load_schema
+
+# Batch estimators by short name; any "module:Class" works too.
+SEARCH_MODELS = {
+    "logistic_regression": "sklearn.linear_model:LogisticRegression",
+    "ridge": "sklearn.linear_model:Ridge",
+    "random_forest_classifier": "sklearn.ensemble:RandomForestClassifier",
+    "random_forest_regressor": "sklearn.ensemble:RandomForestRegressor",
+    "hist_gradient_boosting_classifier": "sklearn.ensemble:HistGradientBoostingClassifier",
+    "hist_gradient_boosting_regressor": "sklearn.ensemble:HistGradientBoostingRegressor",
+    "kneighbors_classifier": "sklearn.neighbors:KNeighborsClassifier",
+    "svc": "sklearn.svm:SVC",
+    **INCREMENTAL_MODELS
+}
+
+# {"loguniform": [1e-4, 1]} style distributions for random search.
+DISTRIBUTIONS = ("uniform", "loguniform", "randint")
+
+WORK_DIR = ".chester_train"
+WRITE_CHUNK_ROWS = 1_000_000
+
+
+def _parse_space(space, randomized):
+    if not randomized:
+        return space
+    from scipy import stats
+    parsed = {}
+    for name, values in space.items():
+        if isinstance(values, dict) and len(values) == 1 and next(iter(values)) in DISTRIBUTIONS:
+            kind, (low, high) = next(iter(values.items()))
+            if kind == "uniform":
+                parsed[name] = stats.uniform(low, high - low)
+            else:
+                parsed[name] = getattr(stats, kind)(low, high)
+        else:
+            parsed[name] = values
+    return parsed
+
+
+def build_matrix(data_dir, target, features=None, dtype="float64", work_dir=WORK_DIR):
+    """
+    Builds the training matrix from a statement written with --format npy.
+    X is written column by column to a .npy file and reopened read-only with
+    mmap_mode="r", so joblib workers map the same pages instead of receiving
+    pickled copies. Category columns become their integer codes and nulls 0.
+    Returns (X, y, feature_names).
+    """
+    schema = load_schema(data_dir)
+    columns = load_columns(data_dir)
+    if target not in columns:
+        raise KeyError(f"Target column '{target}' not found in {data_dir}.")
+    features = features or [name for name in columns if name != target]
+    rows = schema["rows"]
+
+    os.makedirs(work_dir, exist_ok=True)
+    x_path = os.path.join(work_dir, "X.npy")
+    X = np.lib.format.open_memmap(x_path, mode="w+", dtype=np.dtype(dtype), shape=(rows, len(features)))
+    for index, name in enumerate(features):
+        column = schema["columns"][name]
+        values = columns[name]
+        valid = np.load(os.path.join(data_dir, column["valid"]), mmap_mode="r") if "valid" in column else None
+        for start in range(0, rows, WRITE_CHUNK_ROWS):
+            chunk = values[start:start + WRITE_CHUNK_ROWS]
+            if column["kind"] == "datetime":
+                chunk = chunk.astype(np.int64) / 1e6
+            chunk = chunk.astype(X.dtype)
+            if valid is not None:
+                chunk = np.where(valid[start:start + WRITE_CHUNK_ROWS], chunk, 0)
+            X[start:start + WRITE_CHUNK_ROWS, index] = chunk
+    X.flush()
+    del X
+
+    target_column = schema["columns"][target]
+    y = np.asarray(columns[target])
+    if target_column["kind"] == "category":
+        # Decode so the fitted model predicts labels rather than codes.
+        y = np.load(os.path.join(data_dir, target_column["categories"]))[y]
+    if "valid" in target_column:
+        keep = np.load(os.path.join(data_dir, target_column["valid"]))
+        if not keep.all():
+            raise ValueError(f"Target column '{target}' has nulls; filter them in the statement.")
+    return np.load(x_path, mmap_mode="r"), y, features
+
+
+def extract_source(label, work_dir=WORK_DIR):
+    """Extracts the statement "provider.name" into work_dir with the npy writer."""
+    from chester_ml.bulk_load import statement_batches
+    from chester_ml.writers.numpy_writer import NumpyWriter
+
+    writer = NumpyWriter(work_dir)
+    provider, _, name = label.partition(".")
+    writer.write_statement("data", name, statement_batches(label))
+    writer.close()
+    return os.path.join(work_dir, "data", name)
+
+
+def run_search(name, config, data_dir=None, n_jobs=None):
+    """
+    Fits the model described by a training config from the universe, with
+    an optional grid or random hyperparameter search parallelised through
+    joblib (loky processes), and saves the best estimator. Returns the
+    report: per-candidate fit/score times and scores plus the best params.
+    """
+    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+
+    work_dir = os.path.join(WORK_DIR, name)
+    if data_dir is None:
+        if not config.get("source"):
+            raise ValueError(f"Training config '{name}' needs a \"source\" statement (provider.name) or --data.")
+        logger.info(f"📦 Extracting {config['source']} for training...")
+        data_dir = extract_source(config["source"], work_dir)
+
+    X, y, features = build_matrix(data_dir, config["target"], config.get("features"),
+                                  config.get("dtype", "float64"), work_dir)
+    logger.info(f"🧮 Training matrix: {X.shape[0]:,} rows x {X.shape[1]} features (memory-mapped)")
+
+    model = config["model"]
+    estimator = load_object(SEARCH_MODELS.get(model, model))(**config.get("params", {}))
+    search = config.get("search")
+    n_jobs = n_jobs if n_jobs is not None else config.get("n_jobs", -1)
+
+    start = time.perf_counter()
+    if search:
+        randomized = search.get("type", "grid") == "random"
+        space = _parse_space(search["space"], randomized)
+        options = {
+            "cv": search.get("cv", 5),
+            "scoring": search.get("scoring"),
+            "n_jobs": n_jobs,
+            "pre_dispatch": "2*n_jobs",
+            "refit": True
+        }
+        if randomized:
+            searcher = RandomizedSearchCV(estimator, space, n_iter=search.get("n_iter", 20),
+                                          random_state=search.get("random_state"), **options)
+        else:
+            searcher = GridSearchCV(estimator, space, **options)
+        searcher.fit(X, y)
+        best = searcher.best_estimator_
+        candidates = _candidates(searcher.cv_results_)
+        best_params, best_score = _plain(searcher.best_params_), float(searcher.best_score_)
+    else:
+        best = estimator.fit(X, y)
+        candidates, best_params, best_score = [], config.get("params", {}), None
+    elapsed = time.perf_counter() - start
+
+    output = config.get("output") or os.path.join(MODELS_DIR, f"{name}.joblib")
+    _save(best, features, config["target"], X.shape[0], output)
+
+    report = {
+        "name": name,
+        "model": type(best).__name__,
+        "rows": int(X.shape[0]),
+        "features": features,
+        "n_jobs": n_jobs,
+        "elapsed_seconds": round(elapsed, 3),
+        "best_params": best_params,
+        "best_score": best_score,
+        "candidates": candidates,
+        "output": output
+    }
+    with open(os.path.splitext(output)[0] + ".search.json", "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4, default=str)
+    return report
+
+
+def _plain(params):
+    """NumPy scalars (e.g. from randint) → Python values, for JSON reports."""
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in params.items()}
+
+
+def _candidates(results):
+    candidates = []
+    for index, params in enumerate(results["params"]):
+        candidates.append({
+            "rank": int(results["rank_test_score"][index]),
+            "params": _plain(params),
+            "mean_score": float(results["mean_test_score"][index]),
+            "std_score": float(results["std_test_score"][index]),
+            "mean_fit_seconds": round(float(results["mean_fit_time"][index]), 4),
+            "mean_score_seconds": round(float(results["mean_score_time"][index]), 4)
+        })
+    return sorted(candidates, key=lambda candidate: candidate["rank"])
+
+
+def _save(estimator, features, target, rows, output):
+    import joblib
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Same bundle layout as StreamTrainer; features name the X columns.
+    joblib.dump({
+        "estimator": estimator,
+        "features": features,
+        "target": target,
+        "rows": rows,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }, output)
+    logger.success(f"🧠 Model saved to {output}")
+
+
+def log_report(report, top=10):
+    logger.info("───────────────────────────────")
+    for candidate in report["candidates"][:top]:
+        logger.info(f"🏅 #{candidate['rank']:<3} score {candidate['mean_score']:.4f} ± {candidate['std_score']:.4f} "
+                    f"fit {candidate['mean_fit_seconds']:.3f}s {candidate['params']}")
+    if len(report["candidates"]) > top:
+        logger.info(f"… {len(report['candidates']) - top} more candidates in the search report")
+    logger.info(f"🎯 Best params: {report['best_params']} (score {report['best_score']}) "
+                f"in {report['elapsed_seconds']:.1f}s with n_jobs={report['n_jobs']}")
+    logger.info("───────────────────────────────")
@@ -0,0 +1,188 @@
+import os
+import time
+from numbers import Number
+import numpy as np
+from loguru import logger
+from chester_ml.providers.registry import load_object
+from chester_ml.utils.metrics import span
+from chester_ml.writers.encoding import encode
+
+# Estimators that implement partial_fit, by short name. Any other
+# "module:Class" with a partial_fit method can be used directly.
+INCREMENTAL_MODELS = {
+    "sgd_classifier": "sklearn.linear_model:SGDClassifier",
+    "sgd_regressor": "sklearn.linear_model:SGDRegressor",
+    "passive_aggressive_classifier": "sklearn.linear_model:PassiveAggressiveClassifier",
+    "perceptron": "sklearn.linear_model:Perceptron",
+    "multinomial_nb": "sklearn.naive_bayes:MultinomialNB",
+    "bernoulli_nb": "sklearn.naive_bayes:BernoulliNB",
+    "minibatch_kmeans": "sklearn.cluster:MiniBatchKMeans",
+    "incremental_pca": "sklearn.decomposition:IncrementalPCA"
+}
+
+DEFAULT_HASH_FEATURES = 2 ** 18
+# Dense-only estimators get a much smaller default hashing space.
+DEFAULT_DENSE_HASH_FEATURES = 2 ** 10
+MODELS_DIR = "models"
+
+# These estimators reject negative inputs or sparse matrices.
+NON_NEGATIVE_MODELS = ("MultinomialNB",)
+DENSE_ONLY_MODELS = ("IncrementalPCA",)
+
+
+class HashedFeatures:
+    """
+    Stateless vectorizer: FeatureHasher over each row's fields. Numbers are
+    used as values and anything else becomes a "field=value" indicator, so
+    unseen categories never need a fitted vocabulary.
+    """
+
+    def __init__(self, exclude=(), n_features=DEFAULT_HASH_FEATURES, alternate_sign=True, dense=False):
+        from sklearn.feature_extraction import FeatureHasher
+        self.exclude = set(exclude)
+        self.dense = dense
+        self.hasher = FeatureHasher(n_features=n_features, input_type="dict", alternate_sign=alternate_sign)
+
+    def _features(self, row):
+        features = {}
+        for key, value in row.items():
+            if value is None or key in self.exclude:
+                continue
+            if isinstance(value, bool):
+                value = int(value)
+            elif not isinstance(value, Number):
+                value = value if isinstance(value, str) else encode(value)
+            features[str(key)] = value
+        return features
+
+    def transform(self, rows):
+        matrix = self.hasher.transform(self._features(row) for row in rows)
+        return matrix.toarray() if self.dense else matrix
+
+
+class DenseFeatures:
+    """Vectorizer for an explicit list of numeric fields; nulls become 0."""
+
+    def __init__(self, features):
+        self.features = list(features)
+
+    def transform(self, rows):
+        matrix = np.array([[row.get(name) for name in self.features] for row in rows], dtype=np.float64)
+        return np.nan_to_num(matrix, copy=False)
+
+
+class StreamTrainer:
+    """
+    Trains an incremental scikit-learn estimator on a statement's result
+    while it streams, batch by batch via partial_fit, so extractions larger
+    than RAM never need to be materialized. Configured by the statement's
+    "train" key:
+
+        "train": {
+            "model": "sgd_classifier",        # short name or "module:Class"
+            "params": {"loss": "log_loss"},
+            "target": "churned",              # omit for clustering/PCA
+            "classes": [0, 1],                # classifiers; else the first batch's
+            "features": ["age", "spend"],     # dense numeric features, or
+            "hash_features": 262144,          # hash every field (default)
+            "output": "models/churn.joblib"
+        }
+
+    The fitted model is saved with joblib, together with its vectorizer,
+    only once the stream has been fully consumed.
+    """
+
+    def __init__(self, config, provider, name):
+        self.config = config
+        self.label = f"{provider}.{name}"
+        model = config.get("model")
+        if not model:
+            raise ValueError(f"\"train\" in {self.label} needs a \"model\".")
+        self.estimator = load_object(INCREMENTAL_MODELS.get(model, model))(**config.get("params", {}))
+        if not hasattr(self.estimator, "partial_fit"):
+            raise ValueError(f"Model '{model}' does not support partial_fit.")
+
+        self.target = config.get("target")
+        self.classes = config.get("classes")
+        self.output = config.get("output") or os.path.join(MODELS_DIR, provider, f"{name}.joblib")
+        self.vectorizer = self._vectorizer()
+        self.rows = 0
+        self.batches = 0
+        self.fit_seconds = 0.0
+
+    def _vectorizer(self):
+        if self.config.get("features"):
+            return DenseFeatures(self.config["features"])
+        estimator_name = type(self.estimator).__name__
+        dense = estimator_name in DENSE_ONLY_MODELS
+        default_features = DEFAULT_DENSE_HASH_FEATURES if dense else DEFAULT_HASH_FEATURES
+        return HashedFeatures(
+            exclude=[self.target] if self.target else [],
+            n_features=int(self.config.get("hash_features", default_features)),
+            alternate_sign=estimator_name not in NON_NEGATIVE_MODELS,
+            dense=dense
+        )
+
+    def partial_fit(self, batch):
+        if self.target:
+            # Rows without a label cannot be used for supervised training.
+            batch = [row for row in batch if row.get(self.target) is not None]
+        if not batch:
+            return
+        with span("train"):
+            self._fit(batch)
+
+    def _fit(self, batch):
+        start = time.perf_counter()
+        X = self.vectorizer.transform(batch)
+        if self.target:
+            y = np.array([row.get(self.target) for row in batch])
+            options = {}
+            if self.batches == 0 and self._needs_classes():
+                if self.classes is None:
+                    self.classes = np.unique(y).tolist()
+                    logger.warning(f"⚠️ No \"classes\" for {self.label}; using those of the first batch: {self.classes}")
+                options["classes"] = np.array(self.classes)
+            self.estimator.partial_fit(X, y, **options)
+        else:
+            self.estimator.partial_fit(X)
+        self.fit_seconds += time.perf_counter() - start
+        self.rows += len(batch)
+        self.batches += 1
+
+    def _needs_classes(self):
+        from sklearn.base import is_classifier
+        return is_classifier(self.estimator)
+
+    def fit_stream(self, batches):
+        """Pass-through generator: trains on every batch before handing it on."""
+        for batch in batches:
+            self.partial_fit(batch)
+            yield batch
+        self.save()
+
+    def save(self):
+        import joblib
+        if not self.rows:
+            logger.warning(f"⚠️ No rows to train {self.label}; model not saved.")
+            return None
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        bundle = {
+            "estimator": self.estimator,
+            "vectorizer": self.vectorizer,
+            "target": self.target,
+            "rows": self.rows,
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        joblib.dump(bundle, self.output)
+        logger.success(f"🧠 Trained {type(self.estimator).__name__} on {self.rows:,} rows of {self.label} "
+                       f"in {self.batches} batches ({self.fit_seconds:.2f}s fitting) → {self.output}")
+        return self.output
+
+
+def load_model(path):
+    """Loads a bundle saved by StreamTrainer: {"estimator", "vectorizer", "target", ...}."""
+    import joblib
+    return joblib.load(path)
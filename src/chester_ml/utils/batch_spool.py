@@ -0,0 +1,121 @@
+import os
+import pickle
+import tempfile
+import weakref
+
+
+def dump_batch(file, batch):
+    """Appends one row batch to a binary spool file."""
+    pickle.dump(batch, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def replay_batches(path):
+    """Yields the row batches stored in a spool file, one at a time."""
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+class SpillPartitions:
+    """
+    Hash-partitioned spool: rows are routed to one of `count` spool files
+    by partition index and buffered so each dump holds up to `batch_size`
+    rows. Used by operators whose state outgrows their memory budget.
+    """
+
+    def __init__(self, directory, prefix, count, batch_size=10000):
+        self.paths = [os.path.join(directory, f"{prefix}-{index}.pkl") for index in range(count)]
+        self.rows = [0] * count
+        self.batch_size = batch_size
+        self._buffers = [[] for _ in range(count)]
+        self._files = [None] * count
+
+    def add(self, index, row):
+        buffer = self._buffers[index]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush(index)
+
+    def _flush(self, index):
+        if not self._buffers[index]:
+            return
+        if self._files[index] is None:
+            self._files[index] = open(self.paths[index], "wb")
+        dump_batch(self._files[index], self._buffers[index])
+        self.rows[index] += len(self._buffers[index])
+        self._buffers[index] = []
+
+    def close(self):
+        for index in range(len(self.paths)):
+            self._flush(index)
+            if self._files[index] is not None:
+                self._files[index].close()
+                self._files[index] = None
+
+    def replay(self, index):
+        """Batches of partition `index`; empty if nothing was spilled to it."""
+        if self.rows[index]:
+            yield from replay_batches(self.paths[index])
+
+    def remove(self):
+        self.close()
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class SpilledResult:
+    """
+    A statement result kept in a spool file instead of in memory, returned
+    by runs whose memory budget was exhausted. Iterating it replays the rows
+    lazily and len() is the row count; the file is removed once the object
+    is garbage collected.
+    """
+
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(prefix="chester-result-", suffix=".pkl", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self.rows = 0
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    def add(self, batch):
+        if batch:
+            dump_batch(self._file, batch)
+            self.rows += len(batch)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def iter_batches(self, batch_size=None):
+        """Yields the rows back as lists of dicts, regrouped to `batch_size` if given."""
+        self.close()
+        if not batch_size:
+            yield from replay_batches(self.path)
+            return
+        pending = []
+        for batch in replay_batches(self.path):
+            pending.extend(batch)
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                del pending[:batch_size]
+        if pending:
+            yield pending
+
+    def __iter__(self):
+        for batch in self.iter_batches():
+            yield from batch
+
+    def __len__(self):
+        return self.rows
+
+    def __repr__(self):
+        return f"SpilledResult({self.rows} rows in {self.path})"
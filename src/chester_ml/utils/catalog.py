@@ -0,0 +1,363 @@
+import difflib
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from loguru import logger
+from chester_ml.providers.registry import get_section
+from chester_ml.utils.watermark_store import DEFAULT_STATE_DIR
+
+CATALOG_VERSION = 3
+CATALOG_FILE = "catalog-{}.pickle"
+
+# Universe files are routed by the words in their name: remote.json,
+# universe-local.json, train_configs.json...
+FILE_KINDS = (("remote", "remote"), ("loca", "local"), ("train", "training"))
+
+NUMBER = (int, float)
+STATEMENT_KEYS = {
+    "query": str,
+    "path": str,
+    "collection": str,
+    "format": str,
+    "encoding": str,
+    "delimiter": str,
+    "filter": dict,
+    "params": (list, dict),
+    "projection": (list, dict),
+    "sort": (list, dict),
+    "hint": (str, list, dict),
+    "stream": bool,
+    "dataset": bool,
+    "cache": bool,
+    "chunk_size": int,
+    "batch_size": int,
+    "limit": int,
+    "timeout": NUMBER,
+    "cache_ttl": NUMBER,
+    "freshness_query": (str, list),
+    "columns": list,
+    "sample": (int, float, dict),
+    "seed": int,
+    "incremental": (str, dict),
+    "train": dict,
+    "depends_on": (str, list),
+    "cost": NUMBER,
+    "from": str,
+    "join": (list, dict),
+    "group_by": (str, list),
+    "aggregate": dict,
+    "memory_limit_mb": NUMBER,
+    "partitions": int,
+    "split_by": str,
+    "splits": int,
+    "split_mode": str,
+    "split_bounds": list,
+    "split_workers": int
+}
+POSITIVE_KEYS = ("chunk_size", "batch_size", "timeout", "cache_ttl", "cost", "memory_limit_mb", "partitions",
+                 "splits", "split_workers")
+REQUIRED_KEYS = {
+    "SQL": ("query",),
+    "MONGO": (),
+    "FILES": ("path",),
+    "SQLITE": ("path", "query"),
+    "JOIN": ("from",)
+}
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+class CatalogError(ValueError):
+    """Raised when the universe files do not validate; carries every problem found."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__(f"{len(self.problems)} problem(s) in the statement catalog: " + "; ".join(self.problems))
+
+
+def _file_kind(filename):
+    words = re.split(r"[^a-z]+", os.path.splitext(filename)[0].lower())
+    for prefix, kind in FILE_KINDS:
+        if any(word.startswith(prefix) for word in words):
+            return kind
+    return None
+
+
+def _signature(universe_dir):
+    """(name, mtime_ns, size) of every universe file: the catalog's cache key."""
+    entries = []
+    for filename in sorted(os.listdir(universe_dir)):
+        if filename.endswith(".json"):
+            stat = os.stat(os.path.join(universe_dir, filename))
+            entries.append((filename, stat.st_mtime_ns, stat.st_size))
+    return (CATALOG_VERSION, tuple(entries))
+
+
+def _type_name(expected):
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    return " or ".join(kind.__name__ for kind in expected)
+
+
+def _check_value(value, expected):
+    # bool is an int subclass: "limit": true is a typo, not a limit of 1.
+    if isinstance(value, bool) and bool not in (expected if isinstance(expected, tuple) else (expected,)):
+        return False
+    return isinstance(value, expected)
+
+
+def _validate_statement(section, name, statement, problems, warnings):
+    where = f"{section}.{name}"
+    if not isinstance(statement, dict):
+        problems.append(f"{where}: a statement must be an object, got {type(statement).__name__}")
+        return
+
+    # Plugin sections define their own keys; only depends_on is checked there.
+    builtin = section in REQUIRED_KEYS
+    for key, value in statement.items():
+        expected = STATEMENT_KEYS.get(key)
+        if expected is None:
+            if not builtin:
+                continue
+            close = difflib.get_close_matches(key, STATEMENT_KEYS, n=1, cutoff=0.8)
+            if close:
+                problems.append(f"{where}: unknown key '{key}' (did you mean '{close[0]}'?)")
+            else:
+                warnings.append(f"{where}: unknown key '{key}' is ignored")
+        elif not _check_value(value, expected):
+            problems.append(f"{where}: '{key}' must be {_type_name(expected)}, got {type(value).__name__}")
+        elif key in POSITIVE_KEYS and value <= 0:
+            problems.append(f"{where}: '{key}' must be positive")
+
+    for key in REQUIRED_KEYS.get(section, ()):
+        if not statement.get(key):
+            problems.append(f"{where}: missing required '{key}'")
+
+    if isinstance(statement.get("columns"), list) and not all(isinstance(c, str) for c in statement["columns"]):
+        problems.append(f"{where}: 'columns' must be a list of names")
+    if "sample" in statement:
+        from chester_ml.utils.query_rewriter import sample_spec
+        try:
+            sample_spec(statement)
+        except (TypeError, ValueError) as e:
+            problems.append(f"{where}: {e}")
+    if "split_by" in statement:
+        from chester_ml.utils.query_rewriter import split_spec
+        try:
+            split_spec(statement)
+        except (TypeError, ValueError) as e:
+            problems.append(f"{where}: {e}")
+    if "incremental" in statement:
+        from chester_ml.engines.incremental import incremental_spec
+        try:
+            incremental_spec(statement)
+        except ValueError as e:
+            problems.append(f"{where}: {e}")
+    if isinstance(statement.get("train"), dict) and not statement["train"].get("model"):
+        problems.append(f"{where}: \"train\" needs a \"model\"")
+    if section == "JOIN":
+        from chester_ml.engines.join_engine import join_plan
+        try:
+            join_plan(statement)
+        except (TypeError, ValueError) as e:
+            problems.append(f"{where}: {e}")
+
+
+def _label(section, reference):
+    """Normalizes a reference to a "SECTION.name" label; a bare name means the same section."""
+    owner, _, name = reference.rpartition(".")
+    return f"{owner.upper() or section}.{name}"
+
+
+def _labels(section, declared):
+    """Distinct labels of the valid references in `declared` (a name or a list)."""
+    if isinstance(declared, str):
+        declared = [declared]
+    labels = []
+    for item in declared:
+        if not isinstance(item, str) or not item:
+            continue
+        label = _label(section, item)
+        if label not in labels:
+            labels.append(label)
+    return tuple(labels)
+
+
+def _topological_order(dependencies, problems):
+    """Kahn's algorithm; statements left over sit on a cycle."""
+    waiting = {label: len(set(upstream)) for label, upstream in dependencies.items()}
+    downstream = {label: [] for label in dependencies}
+    for label, upstream in dependencies.items():
+        for dependency in set(upstream):
+            downstream[dependency].append(label)
+
+    order = [label for label, count in waiting.items() if not count]
+    for label in order:
+        for other in downstream[label]:
+            waiting[other] -= 1
+            if not waiting[other]:
+                order.append(other)
+    if len(order) < len(dependencies):
+        cycle = sorted(set(dependencies) - set(order))
+        problems.append(f"dependency cycle between: {', '.join(cycle)}")
+    return order
+
+
+class StatementCatalog:
+    """
+    Compiled view of a universe directory: every remote/local statement and
+    training config, validated up front, with "depends_on" resolved into a
+    DAG of "SECTION.name" labels in topological order.
+    """
+
+    def __init__(self, universe_dir, signature):
+        self.universe_dir = universe_dir
+        self.signature = signature
+        self.remote = {}
+        self.local = {}
+        self.training = {}
+        self.dependencies = {}
+        self.inputs = {}
+        self.order = []
+        self.warnings = []
+
+    @classmethod
+    def compile(cls, universe_dir, signature=None):
+        catalog = cls(universe_dir, signature or _signature(universe_dir))
+        problems = []
+        for filename, _, _ in catalog.signature[1]:
+            kind = _file_kind(filename)
+            if kind is None:
+                catalog.warnings.append(f"{filename}: not a remote, local or train file; ignored")
+                continue
+            try:
+                with open(os.path.join(universe_dir, filename), "r", encoding="utf-8") as file:
+                    content = json.load(file)
+            except ValueError as e:
+                problems.append(f"{filename}: invalid JSON ({e})")
+                continue
+            if not isinstance(content, dict):
+                problems.append(f"{filename}: the top level must be an object")
+                continue
+            if kind == "training":
+                catalog._add_training(filename, content, problems)
+            else:
+                catalog._add_statements(filename, kind, content, problems)
+
+        for label, upstream in catalog.dependencies.items():
+            for dependency in upstream:
+                if dependency == label:
+                    problems.append(f"{label}: depends on itself")
+                elif dependency not in catalog.dependencies:
+                    problems.append(f"{label}: depends on unknown statement '{dependency}'")
+        if not problems:
+            catalog.order = _topological_order(catalog.dependencies, problems)
+        if problems:
+            raise CatalogError(problems)
+        return catalog
+
+    def _add_statements(self, filename, context, content, problems):
+        statements = self.remote if context == "remote" else self.local
+        for section, entries in content.items():
+            section = section.upper()
+            if not isinstance(entries, dict):
+                problems.append(f"{filename}: section {section} must be an object of statements")
+                continue
+            try:
+                spec = get_section(section)
+                if spec.context != context:
+                    problems.append(f"{filename}: {section} statements belong in a {spec.context} universe file")
+            except KeyError:
+                self.warnings.append(f"{filename}: no provider registered for section {section}")
+
+            statements.setdefault(section, {})
+            for name, statement in entries.items():
+                label = f"{section}.{name}"
+                if label in self.dependencies:
+                    problems.append(f"{filename}: {label} is already defined in another universe file")
+                    continue
+                _validate_statement(section, name, statement, problems, self.warnings)
+                statements[section][name] = statement
+                self.dependencies[label] = ()
+                if not isinstance(statement, dict):
+                    continue
+                declared = _labels(section, statement.get("depends_on") or [])
+                if section == "JOIN":
+                    # A join reads its inputs, so it also depends on them. Inputs
+                    # keep repeats (self-joins): one per "from"/"with".
+                    from chester_ml.engines.join_engine import join_inputs
+                    self.inputs[label] = tuple(_label(section, item) for item in join_inputs(statement))
+                    declared = self.inputs[label] + declared
+                self.dependencies[label] = _labels(section, declared)
+
+    def _add_training(self, filename, content, problems):
+        for name, config in content.items():
+            if name in self.training:
+                problems.append(f"{filename}: training config '{name}' is already defined")
+            elif not isinstance(config, dict) or not config.get("model"):
+                problems.append(f"{filename}: training config '{name}' needs a \"model\"")
+            else:
+                self.training[name] = config
+
+    def with_dependencies(self, labels):
+        """`labels` plus everything upstream of them, in topological order."""
+        needed = set()
+        stack = list(labels)
+        while stack:
+            label = stack.pop()
+            if label not in needed:
+                needed.add(label)
+                stack.extend(self.dependencies.get(label, ()))
+        return [label for label in self.order if label in needed]
+
+
+def _cache_path(universe_dir):
+    directory = os.getenv("CHESTER_STATE_DIR", DEFAULT_STATE_DIR)
+    key = hashlib.sha256(os.path.abspath(universe_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, CATALOG_FILE.format(key))
+
+
+def _read_cached(path, signature):
+    try:
+        with open(path, "rb") as file:
+            catalog = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return catalog if getattr(catalog, "signature", None) == signature else None
+
+
+def _write_cached(path, catalog):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(catalog, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        logger.debug(f"Could not cache the statement catalog: {e}")
+
+
+def load_catalog(universe_dir="universes"):
+    """
+    Returns the compiled catalog of `universe_dir`. Files are only re-read
+    and re-validated when one of them changes (name, mtime or size); the
+    compiled result is kept in memory and pickled under the state directory
+    so later runs skip parsing and validation too. Raises CatalogError.
+    """
+    signature = _signature(universe_dir)
+    key = os.path.abspath(universe_dir)
+    with _lock:
+        cached = _compiled.get(key)
+        if cached is None or cached.signature != signature:
+            path = _cache_path(universe_dir)
+            cached = _read_cached(path, signature)
+            if cached is None:
+                cached = StatementCatalog.compile(universe_dir, signature)
+                _write_cached(path, cached)
+                logger.debug(f"📚 Statement catalog compiled from {universe_dir} ({len(cached.order)} statements).")
+            _compiled[key] = cached
+    for warning in cached.warnings:
+        logger.warning(f"⚠️ {warning}")
+    return cached
@@ -0,0 +1,139 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import numpy as np
+from chester_ml.writers.encoding import encode
+
+KIND_DTYPES = {
+    "bool": np.dtype(np.bool_),
+    "int": np.dtype(np.int64),
+    "float": np.dtype(np.float64),
+    "datetime": np.dtype("datetime64[us]"),
+    "category": np.dtype(np.int32)
+}
+
+# Numeric kinds can widen into each other; anything else must match exactly.
+NUMERIC_RANK = {"bool": 0, "int": 1, "float": 2}
+
+NULL_CODE = -1
+
+
+def infer_kind(value):
+    """Maps a Python value to the column kind used to store it."""
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)):
+        return "int"
+    if isinstance(value, (float, Decimal, np.floating)):
+        return "float"
+    if isinstance(value, (datetime, date)):
+        return "datetime"
+    return "category"
+
+
+def promote(kind, other):
+    """Returns the kind able to hold both, or None if they are incompatible."""
+    if kind == other:
+        return kind
+    if kind in NUMERIC_RANK and other in NUMERIC_RANK:
+        return max(kind, other, key=NUMERIC_RANK.get)
+    return None
+
+
+def values_kind(values, kind=None):
+    """
+    Folds the kinds of every non-null value into `kind` (None = unknown).
+    Incompatible kinds (e.g. an int column meeting a string) fold into
+    "category", which stores every value as its string form.
+    """
+    for value in values:
+        if value is None:
+            continue
+        value_kind = infer_kind(value)
+        if kind is None:
+            kind = value_kind
+        elif kind != "category":
+            kind = promote(kind, value_kind) or "category"
+    return kind
+
+
+class Categories:
+    """Dictionary encoder for string-like columns: value -> int32 code."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        if not isinstance(value, str):
+            value = encode(value) if isinstance(value, (dict, list)) else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def to_numpy(self):
+        return np.array(self.values, dtype=np.str_)
+
+
+def to_categories(array, valid, categories):
+    """
+    Re-encodes a typed column's values as category codes, for a column
+    widened to "category": each valid value becomes the same string a
+    category column would have stored for it. `valid` may be None (no nulls).
+    """
+    codes = np.full(len(array), NULL_CODE, dtype=KIND_DTYPES["category"])
+    for i, value in enumerate(array.tolist()):
+        if value is not None and (valid is None or valid[i]):
+            codes[i] = categories.code(value)
+    return codes
+
+
+def _to_datetime64(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+_CONVERTERS = {
+    "bool": bool,
+    "int": int,
+    "float": float,
+    "datetime": _to_datetime64
+}
+
+_NULLS = {
+    "bool": False,
+    "int": 0,
+    "float": np.nan,
+    "datetime": np.datetime64("NaT", "us"),
+    "category": NULL_CODE
+}
+
+
+def convert(kind, values, categories=None):
+    """
+    Converts a list of Python values into (array, valid) for `kind`.
+    None, and values whose kind does not fit the column, are stored as the
+    kind's null sentinel and flagged False in the validity mask; callers
+    widen the column with values_kind() first, so only None is expected.
+    Category columns accept any value.
+    """
+    n = len(values)
+    valid = np.ones(n, dtype=np.bool_)
+    null = _NULLS[kind]
+    convert_one = categories.code if kind == "category" else _CONVERTERS[kind]
+
+    out = []
+    for i, value in enumerate(values):
+        if value is None:
+            valid[i] = False
+            out.append(null)
+            continue
+        if kind != "category" and promote(kind, infer_kind(value)) != kind:
+            valid[i] = False
+            out.append(null)
+            continue
+        out.append(convert_one(value))
+
+    return np.array(out, dtype=KIND_DTYPES[kind]), valid
@@ -0,0 +1,185 @@
+import numpy as np
+from loguru import logger
+from chester_ml.utils.columnar import KIND_DTYPES, NULL_CODE, Categories, convert, to_categories, values_kind
+
+INITIAL_CAPACITY = 1024
+DEFAULT_BATCH_SIZE = 10000
+
+
+class _Column:
+    """
+    One column as a growable typed buffer. The validity mask is only
+    allocated once the column meets its first null.
+    """
+
+    def __init__(self, name, rows_before):
+        self.name = name
+        self.kind = None
+        self.categories = Categories()
+        self.values = None
+        self.valid = None
+        self.size = 0
+        # Rows seen before the column first appeared (or before its first
+        # non-null value) are nulls.
+        self.pending_nulls = rows_before
+
+    def append(self, values):
+        kind = values_kind(values, self.kind)
+        if kind is None:
+            self.pending_nulls += len(values)
+            return
+        if self.kind is None:
+            self.kind = kind
+            self.values = np.empty(INITIAL_CAPACITY, dtype=KIND_DTYPES[kind])
+            self._append_nulls(self.pending_nulls)
+            self.pending_nulls = 0
+        elif kind != self.kind:
+            logger.debug(f"🔁 Widening column '{self.name}' from {self.kind} to {kind}.")
+            if kind == "category":
+                valid = self.valid[:self.size] if self.valid is not None else None
+                codes = np.empty(len(self.values), dtype=KIND_DTYPES[kind])
+                codes[:self.size] = to_categories(self.values[:self.size], valid, self.categories)
+                self.values = codes
+            else:
+                self.values = self.values.astype(KIND_DTYPES[kind])
+            self.kind = kind
+
+        self._push(*convert(self.kind, values, self.categories))
+
+    def _append_nulls(self, count):
+        if count:
+            self._push(*convert(self.kind, [None] * count, self.categories))
+
+    def _push(self, array, valid):
+        end = self.size + len(array)
+        if end > len(self.values):
+            capacity = max(end, 2 * len(self.values))
+            self.values = np.resize(self.values, capacity)
+            if self.valid is not None:
+                self.valid = np.resize(self.valid, capacity)
+        self.values[self.size:end] = array
+        if self.valid is None and not valid.all():
+            self.valid = np.ones(len(self.values), dtype=np.bool_)
+        if self.valid is not None:
+            self.valid[self.size:end] = valid
+        self.size = end
+
+    def pad(self, rows):
+        """Completes the column with nulls up to `rows` (rows missing this key)."""
+        if self.kind is None:
+            self.pending_nulls = rows
+            return
+        self._append_nulls(rows - self.size)
+
+    def data(self, rows):
+        if self.kind is None:
+            # Every value was null.
+            return np.full(rows, np.nan), np.zeros(rows, dtype=np.bool_)
+        self.pad(rows)
+        valid = self.valid[:rows] if self.valid is not None else None
+        return self.values[:rows], valid
+
+    @property
+    def nbytes(self):
+        total = self.values.nbytes if self.values is not None else 0
+        return total + (self.valid.nbytes if self.valid is not None else 0)
+
+
+class Dataset:
+    """
+    Columnar result built incrementally from row batches: typed NumPy
+    buffers per column, dictionary-encoded categories and a validity mask
+    only where nulls exist. Uses the same kinds as the npy writer
+    (see utils/columnar.py) and a fraction of the memory of row dicts.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self.rows = 0
+
+    @classmethod
+    def from_batches(cls, batches):
+        dataset = cls()
+        for batch in batches:
+            dataset.append(batch)
+        return dataset
+
+    def append(self, batch):
+        """Adds a list of row dicts (scalars become a "value" column)."""
+        if not batch:
+            return
+        batch = [row if isinstance(row, dict) else {"value": row} for row in batch]
+        for row in batch:
+            for key in row:
+                if key not in self._columns:
+                    self._columns[key] = _Column(key, self.rows)
+        for key, column in self._columns.items():
+            column.append([row.get(key) for row in batch])
+        self.rows += len(batch)
+
+    def __len__(self):
+        return self.rows
+
+    def __repr__(self):
+        return f"Dataset({self.rows} rows x {len(self._columns)} columns, {self.nbytes:,} bytes)"
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def schema(self):
+        return {key: column.kind or "float" for key, column in self._columns.items()}
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def column(self, name):
+        """
+        Returns (values, valid) for a column: the typed array (int32 codes
+        for categories) and the validity mask, or None when it has no nulls.
+        """
+        return self._columns[name].data(self.rows)
+
+    def categories(self, name):
+        """Category labels of a dictionary-encoded column, indexed by code."""
+        return self._columns[name].categories.to_numpy()
+
+    def to_numpy(self, columns=None, dtype=np.float64):
+        """
+        Feature matrix of shape (rows, columns), built column by column with
+        vectorized casts. Bools become 0/1, datetimes seconds since the epoch,
+        categories their integer codes, and nulls NaN.
+        """
+        columns = columns or self.columns
+        matrix = np.empty((self.rows, len(columns)), dtype=dtype)
+        for index, name in enumerate(columns):
+            values, valid = self.column(name)
+            kind = self._columns[name].kind
+            if kind == "datetime":
+                values = values.astype("datetime64[us]").astype(np.int64) / 1e6
+            matrix[:, index] = values
+            if valid is not None:
+                matrix[~valid, index] = np.nan
+        return matrix
+
+    def iter_batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Yields the rows back as lists of dicts, e.g. to hand them to a writer."""
+        decoded = {}
+        for name in self.columns:
+            values, valid = self.column(name)
+            if self._columns[name].kind == "category":
+                labels = self.categories(name).astype(object)
+                values = np.where(values == NULL_CODE, None, labels[np.maximum(values, 0)] if len(labels) else None)
+            decoded[name] = (values, valid)
+
+        for start in range(0, self.rows, batch_size):
+            stop = min(start + batch_size, self.rows)
+            chunk = {}
+            for name, (values, valid) in decoded.items():
+                items = values[start:stop].tolist()
+                if valid is not None:
+                    items = [item if ok else None for item, ok in zip(items, valid[start:stop].tolist())]
+                chunk[name] = items
+            yield [dict(zip(chunk, row)) for row in zip(*chunk.values())]
@@ -1,26 +1,32 @@
 import sys
-import time
 from loguru import logger
 
-def log_mode(levels: str):
-    logger.remove()
+PRIORITY = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
 
+def active_levels(levels):
+    """"INFO,ERROR" (or a list) → the valid levels in it, or None if there are none."""
     if isinstance(levels, str):
         levels = [lvl.strip().upper() for lvl in levels.split(",")]
+    return [lvl for lvl in levels or [] if lvl in PRIORITY] or None
 
-    valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-    levels = [lvl for lvl in levels if lvl in valid_levels]
+
+def base_level(levels):
+    return min(levels, key=lambda lvl: PRIORITY.index(lvl))
+
+
+def log_mode(levels: str):
+    logger.remove()
+
+    levels = active_levels(levels)
 
     if not levels:
         logger.warning("⚠️ No valid log levels provided. Defaulting to DEBUG.")
         levels = ["DEBUG"]
 
-    priority = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-    base_level = min(levels, key=lambda lvl: priority.index(lvl))
-
     logger.add(
         sys.stderr,
-        level=base_level,
+        level=base_level(levels),
         filter=lambda record: record["level"].name in levels
     )
 
@@ -29,10 +35,3 @@ def log_mode(levels: str):
 def setup_logger(log_level: str = None):
     logger.remove()
     log_mode(log_level)
-
-def dynamic_log(prefix: str, message: str, delay: float = 0.25):
-        frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-        for frame in frames:
-            print(f"\r{prefix} {frame} {message}", end="", flush=True)
-            time.sleep(delay / len(frames))
-        print("\r", end="")
\ No newline at end of file
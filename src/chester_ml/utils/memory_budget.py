@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+from loguru import logger
+from chester_ml.utils.metrics import span
+
+MB = 1024 * 1024
+# Rows sized per batch; the rest are assumed to look alike.
+SAMPLE_ROWS = 16
+WAIT_INTERVAL = 0.5
+
+
+def estimate_bytes(batch):
+    """
+    Approximate in-memory size of a row batch, from the size of a few
+    sampled rows (the dict plus its values) scaled to the batch. Keys are
+    left out: drivers reuse the same column name objects for every row.
+    """
+    if not batch:
+        return 0
+    step = max(1, len(batch) // SAMPLE_ROWS)
+    sample = batch[::step][:SAMPLE_ROWS]
+    total = 0
+    for row in sample:
+        total += sys.getsizeof(row)
+        if isinstance(row, dict):
+            total += sum(map(sys.getsizeof, row.values()))
+    return sys.getsizeof(batch) + total * len(batch) // len(sample)
+
+
+class MemoryBudget:
+    """
+    Approximate byte budget for the results a run holds in memory.
+
+    Batches travelling from a reader to the writer are "in flight": a
+    producer acquires its batch's size before handing it on and releases it
+    once the consumer asks for the next one, so while the budget is full the
+    readers block (backpressure) instead of fetching more. Results kept for
+    execute_providers' return value are "retained" for the whole run; when
+    one no longer fits, the caller spills it to disk instead.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit = int(limit_bytes)
+        self.in_flight = 0
+        self.retained = 0
+        self.peak = 0
+        self.waits = 0
+        self.waited = 0.0
+        self.spills = 0
+        self.spilled_rows = 0
+        # Sizes of the batches throttle() currently holds in flight, by id.
+        self._batches = {}
+        self._condition = threading.Condition()
+
+    @property
+    def held(self):
+        return self.in_flight + self.retained
+
+    def acquire(self, nbytes, cancelled=None):
+        """
+        Blocks until `nbytes` fit in the budget. A batch is always admitted
+        when nothing else is in flight, so a single oversized batch slows the
+        run down rather than deadlocking it. Returns False if `cancelled`
+        (a threading.Event) is set while waiting.
+        """
+        with self._condition:
+            if self.in_flight and self.held + nbytes > self.limit:
+                self.waits += 1
+                start = time.perf_counter()
+                while self.in_flight and self.held + nbytes > self.limit:
+                    if cancelled is not None and cancelled.is_set():
+                        self.waited += time.perf_counter() - start
+                        return False
+                    self._condition.wait(WAIT_INTERVAL)
+                self.waited += time.perf_counter() - start
+            self.in_flight += nbytes
+            self.peak = max(self.peak, self.held)
+            return True
+
+    def release(self, nbytes):
+        with self._condition:
+            self.in_flight -= nbytes
+            self._condition.notify_all()
+
+    def retain(self, nbytes, batch=None):
+        """
+        Keeps `nbytes` for the rest of the run if they fit; False means spill
+        them. When `batch` is the one throttle() just handed out, its share
+        moves from in flight to retained instead of being counted twice.
+        """
+        with self._condition:
+            moving = self._batches.get(id(batch), 0) if batch is not None else 0
+            if self.held - moving + nbytes > self.limit:
+                return False
+            if moving:
+                del self._batches[id(batch)]
+                self.in_flight -= moving
+            self.retained += nbytes
+            self.peak = max(self.peak, self.held)
+            return True
+
+    def forget(self, nbytes):
+        """Gives back retained bytes, e.g. once their rows were spilled to disk."""
+        with self._condition:
+            self.retained -= nbytes
+            self._condition.notify_all()
+
+    def spilled(self, rows):
+        with self._condition:
+            self.spills += 1
+            self.spilled_rows += rows
+
+    def throttle(self, batches, cancelled=None):
+        """
+        Pass-through generator that holds each batch's size in the budget
+        from the moment it is fetched until the consumer asks for the next.
+        Stops early if `cancelled` is set while waiting for room.
+        """
+        held = None
+        try:
+            for batch in batches:
+                self._let_go(held)
+                held = None
+                size = estimate_bytes(batch)
+                with span("backpressure"):
+                    if not self.acquire(size, cancelled):
+                        return
+                with self._condition:
+                    self._batches[id(batch)] = size
+                held = batch
+                yield batch
+        finally:
+            self._let_go(held)
+            if hasattr(batches, "close"):
+                batches.close()
+
+    def _let_go(self, batch):
+        """Releases a throttled batch's share, unless retain() already took it."""
+        if batch is not None:
+            with self._condition:
+                size = self._batches.pop(id(batch), 0)
+            self.release(size)
+
+    def log_summary(self):
+        message = f"🧮 Memory budget {self.limit / MB:.1f} MB: peak ≈{self.peak / MB:.1f} MB"
+        if self.waits:
+            message += f", producers throttled {self.waits} times ({self.waited:.1f}s)"
+        if self.spills:
+            message += f", {self.spills} results spilled to disk ({self.spilled_rows:,} rows)"
+        logger.info(message)
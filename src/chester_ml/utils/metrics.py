@@ -0,0 +1,185 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from loguru import logger
+
+_local = threading.local()
+_active = None
+
+
+class StatementMetrics:
+    """Timings and volumes collected for one statement."""
+
+    def __init__(self, provider, name):
+        self.provider = provider
+        self.name = name
+        self.phases = {}
+        self.rows = 0
+        self.bytes = 0
+        self.peak_memory = None
+        self.status = "running"
+        self.started = time.time()
+        self.wall = 0.0
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def to_dict(self):
+        return {
+            "provider": self.provider,
+            "statement": self.name,
+            "status": self.status,
+            "wall_seconds": round(self.wall, 6),
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "peak_memory_bytes": self.peak_memory
+        }
+
+
+@contextmanager
+def span(phase):
+    """
+    Times a phase (connect, query, fetch, serialize, write...) of the
+    statement running in this thread. Spans nest and are exclusive: time
+    spent in an inner span is not counted again in the outer one. A no-op
+    when no MetricsRecorder is active.
+    """
+    current = getattr(_local, "statement", None)
+    if current is None:
+        yield
+        return
+    stack = _local.stack
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        current.add_phase(phase, elapsed - stack.pop())
+        if stack:
+            stack[-1] += elapsed
+
+
+def track(provider, name):
+    """Context manager yielding the StatementMetrics of a statement, or None when metrics are off."""
+    recorder = _active
+    if recorder is None:
+        return nullcontext()
+    return recorder.statement(provider, name)
+
+
+class MetricsRecorder:
+    """
+    Collects per-statement metrics for one run and exports them as a JSON
+    report or, for paths ending in .prom, a Prometheus textfile.
+
+    With trace_memory, tracemalloc records peak Python heap usage. The
+    per-statement peak is exact when statements run one at a time; with
+    several workers only the run-level peak is meaningful.
+    """
+
+    def __init__(self, trace_memory=True, exclusive=True):
+        self.statements = []
+        self.lock = threading.Lock()
+        self.trace_memory = trace_memory
+        self.exclusive = exclusive
+        self.started = time.time()
+        self.wall = 0.0
+        self.peak_memory = None
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        global _active
+        _active = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self.wall = time.perf_counter() - self._t0
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        _active = None
+
+    @contextmanager
+    def statement(self, provider, name):
+        """Binds a StatementMetrics to this thread for the statement's duration."""
+        metrics = StatementMetrics(provider, name)
+        with self.lock:
+            self.statements.append(metrics)
+        if self.trace_memory and self.exclusive and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        _local.statement = metrics
+        _local.stack = []
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.wall = time.perf_counter() - start
+            if self.trace_memory and tracemalloc.is_tracing():
+                metrics.peak_memory = tracemalloc.get_traced_memory()[1]
+            _local.statement = None
+
+    def to_dict(self):
+        return {
+            "run": {
+                "started": self.started,
+                "wall_seconds": round(self.wall, 6),
+                "peak_memory_bytes": self.peak_memory,
+                "statements": len(self.statements)
+            },
+            "statements": [metrics.to_dict() for metrics in self.statements]
+        }
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".prom"):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), file, indent=4)
+        logger.success(f"📈 Metrics written to {path}")
+
+    def to_prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+
+        def labels(m, **extra):
+            return {"provider": m.provider, "statement": m.name, **extra}
+
+        metric("chester_statement_duration_seconds", "gauge", "Wall time of a statement.",
+               [(labels(m), round(m.wall, 6)) for m in self.statements])
+        metric("chester_statement_phase_seconds", "gauge", "Time spent per statement phase.",
+               [(labels(m, phase=p), round(s, 6)) for m in self.statements for p, s in m.phases.items()])
+        metric("chester_statement_rows", "gauge", "Rows produced by a statement.",
+               [(labels(m), m.rows) for m in self.statements])
+        metric("chester_statement_bytes", "gauge", "Bytes read by a statement, where the provider reports them.",
+               [(labels(m), m.bytes) for m in self.statements])
+        metric("chester_statement_peak_memory_bytes", "gauge", "Peak traced Python memory during a statement.",
+               [(labels(m), m.peak_memory) for m in self.statements])
+        metric("chester_statement_success", "gauge", "1 if the statement completed, 0 otherwise.",
+               [(labels(m), int(m.status == "ok")) for m in self.statements])
+        metric("chester_run_duration_seconds", "gauge", "Wall time of the whole run.",
+               [({}, round(self.wall, 6))])
+        metric("chester_run_peak_memory_bytes", "gauge", "Peak traced Python memory of the run.",
+               [({}, self.peak_memory)])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,68 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+from loguru import logger
+
+_active = None
+# From 3.12 cProfile is built on sys.monitoring: one profile sees every
+# thread, and a second one cannot be enabled while it is active.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class RunProfiler:
+    """
+    Wraps a run in cProfile and dumps a pstats file to `path`.
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so
+    statement threads profile themselves through thread_profile() and their
+    stats are merged into the dump on exit; from 3.12 the run's profile
+    already covers every thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        global _active
+        _active = self
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self.profile.disable()
+        _active = None
+
+        stats = pstats.Stats(self.profile)
+        with self.lock:
+            for profile in self.thread_profiles:
+                stats.add(profile)
+        stats.dump_stats(self.path)
+
+        summary = io.StringIO()
+        pstats.Stats(self.path, stream=summary).sort_stats("cumulative").print_stats(15)
+        logger.debug(f"🔬 Top functions by cumulative time:\n{summary.getvalue()}")
+        logger.success(f"🔬 Profile written to {self.path} (inspect with python -m pstats)")
+
+
+@contextmanager
+def thread_profile():
+    """Profiles the current worker thread while a RunProfiler is active (before 3.12)."""
+    profiler = _active
+    if profiler is None or not PER_THREAD_PROFILES:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        with profiler.lock:
+            profiler.thread_profiles.append(profile)
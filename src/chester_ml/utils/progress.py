@@ -0,0 +1,127 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
+FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+
+_local = threading.local()
+
+
+class ProgressCounter:
+    """
+    Rows/bytes counter for one statement. add() is a couple of integer
+    additions, cheap enough to call per batch from any hot path; the
+    renderer only reads these fields.
+    """
+
+    __slots__ = ("label", "rows", "bytes", "started", "finished")
+
+    def __init__(self, label):
+        self.label = label
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.bytes += nbytes
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+
+# Sink for reports made outside any tracked statement.
+_discard = ProgressCounter("discard")
+
+
+def current():
+    """Counter of the statement running in this thread (a no-op sink otherwise)."""
+    return getattr(_local, "counter", None) or _discard
+
+
+def bind(counter):
+    """Makes `counter` the current() counter for this thread (None unbinds)."""
+    _local.counter = counter
+
+
+def _format_bytes(value):
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+class ProgressReporter:
+    """
+    Renders live per-statement progress on one terminal line from a
+    background thread, so producers never wait on the display.
+
+    Disabled automatically when the stream is not a TTY (piped output, cron,
+    log files) or CHESTER_PROGRESS=0; counters keep working either way.
+    """
+
+    def __init__(self, stream=None, interval=0.2, enabled=None):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        if enabled is None:
+            enabled = os.getenv("CHESTER_PROGRESS", "1") != "0" and self.stream.isatty()
+        self.enabled = enabled
+        self.counters = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def track(self, label):
+        counter = ProgressCounter(label)
+        with self.lock:
+            self.counters = [c for c in self.counters if c.finished is None]
+            self.counters.append(counter)
+        return counter
+
+    def start(self):
+        if self.enabled and self.thread is None:
+            self.thread = threading.Thread(target=self._render_loop, name="chester-progress", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _render_loop(self):
+        frame = 0
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                active = [c for c in self.counters if c.finished is None]
+            if not active:
+                continue
+            parts = []
+            for counter in active:
+                rate = counter.rows / counter.elapsed if counter.elapsed else 0
+                part = f"{counter.label} {counter.rows:,} rows ({rate:,.0f}/s)"
+                if counter.bytes:
+                    part += f" {_format_bytes(counter.bytes)}"
+                parts.append(f"{part} {counter.elapsed:.1f}s")
+            width = shutil.get_terminal_size().columns - 1
+            line = f"{FRAMES[frame % len(FRAMES)]} " + " | ".join(parts)
+            self.stream.write("\r\033[K" + line[:width])
+            self.stream.flush()
+            frame += 1
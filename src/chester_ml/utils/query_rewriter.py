@@ -0,0 +1,288 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from chester_ml.writers.encoding import json_default
+
+
+def quote_sql_identifier(name):
+    """Quotes a (possibly dotted) MySQL identifier with backticks."""
+    return ".".join(f"`{part.replace('`', '``')}`" for part in str(name).split("."))
+
+
+def strip_sql(query):
+    """Removes surrounding whitespace and trailing semicolons so a query can be nested."""
+    return query.strip().rstrip(";").strip()
+
+
+def sql_after_watermark(query, column, watermark, params=None):
+    """
+    Wraps `query` so it only returns rows whose `column` is greater than
+    `watermark`. Returns (query, params): the watermark is appended to the
+    query's own positional `params`. A query that had none gets its literal
+    "%" escaped, since the driver only applies %s formatting with params.
+    """
+    query = strip_sql(query)
+    if not params:
+        query = query.replace("%", "%%")
+    column = quote_sql_identifier(column)
+    wrapped = f"SELECT * FROM ({query}) AS _chester_src WHERE {column} > %s ORDER BY {column}"
+    return wrapped, [*(params or []), watermark]
+
+
+def mongo_after_watermark(filter_query, column, watermark):
+    """Adds a {column: {"$gt": watermark}} condition to a Mongo filter."""
+    condition = {column: {"$gt": watermark}}
+    if not filter_query:
+        return condition
+    return {"$and": [filter_query, condition]}
+
+
+INSERT_MODES = ("insert", "ignore", "upsert")
+
+
+def sql_insert(table, columns, mode="insert", dialect="mysql"):
+    """
+    Builds a parameterized INSERT for executemany(). mode "ignore" skips rows
+    that hit a unique key; "upsert" overwrites them. dialect picks the
+    MySQL (%s) or SQLite (?) syntax.
+    """
+    if mode not in INSERT_MODES:
+        raise ValueError(f"Invalid insert mode '{mode}'. Use one of: {', '.join(INSERT_MODES)}")
+    quoted = [quote_sql_identifier(column) for column in columns]
+    placeholder = "?" if dialect == "sqlite" else "%s"
+    values = ", ".join([placeholder] * len(columns))
+
+    if dialect == "sqlite":
+        verb = {"insert": "INSERT", "ignore": "INSERT OR IGNORE", "upsert": "INSERT OR REPLACE"}[mode]
+        return f"{verb} INTO {quote_sql_identifier(table)} ({', '.join(quoted)}) VALUES ({values})"
+
+    verb = "INSERT IGNORE" if mode == "ignore" else "INSERT"
+    query = f"{verb} INTO {quote_sql_identifier(table)} ({', '.join(quoted)}) VALUES ({values})"
+    if mode == "upsert":
+        query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{q} = VALUES({q})" for q in quoted)
+    return query
+
+
+def sql_row_values(rows, columns):
+    """Row dicts → parameter tuples; nested lists/dicts are stored as JSON text."""
+    def value(item):
+        if isinstance(item, (dict, list)):
+            return json.dumps(item, default=json_default)
+        return item
+
+    return [tuple(value(row.get(column)) for column in columns) for row in rows]
+
+
+def sample_spec(statement):
+    """
+    Normalizes a statement's "sample": a fraction (0.01), a row count (1000)
+    or {"fraction"|"count": ..., "seed": 7}. A top-level "seed" also applies.
+    Returns (kind, value, seed) or None.
+    """
+    sample = statement.get("sample")
+    if sample is None:
+        return None
+    seed = statement.get("seed")
+    if isinstance(sample, dict):
+        seed = sample.get("seed", seed)
+        if "fraction" in sample:
+            sample = float(sample["fraction"])
+        elif "count" in sample:
+            sample = int(sample["count"])
+        else:
+            raise ValueError("\"sample\" must declare a \"fraction\" or a \"count\"")
+    if isinstance(sample, float) and 0 < sample < 1:
+        return "fraction", sample, seed
+    if float(sample) >= 1 and float(sample) == int(sample):
+        return "count", int(sample), seed
+    raise ValueError(f"Invalid sample {sample!r}: use a fraction in (0, 1) or a row count")
+
+
+def sql_pushdown(query, columns=None, limit=None, sample=None, dialect="mysql"):
+    """
+    Wraps `query` so projection, sampling and LIMIT run on the server:
+    SELECT cols FROM (query) AS _chester_pd [WHERE RAND(seed) < f]
+    [ORDER BY RAND(seed)] LIMIT n. A count sample is an ORDER BY RAND()
+    LIMIT count. SQLite has no seeded random(), so seeds are ignored there.
+    """
+    if not (columns or limit or sample):
+        return query
+    projection = ", ".join(quote_sql_identifier(column) for column in columns) if columns else "*"
+    wrapped = f"SELECT {projection} FROM ({strip_sql(query)}) AS _chester_pd"
+
+    if dialect == "sqlite":
+        random_value = "(ABS(RANDOM()) / 9223372036854775807.0)"
+    else:
+        seed = sample[2] if sample else None
+        random_value = f"RAND({int(seed)})" if seed is not None else "RAND()"
+
+    if sample and sample[0] == "fraction":
+        wrapped += f" WHERE {random_value} < {float(sample[1])!r}"
+    elif sample and sample[0] == "count":
+        wrapped += f" ORDER BY {random_value}"
+        limit = min(int(limit), sample[1]) if limit else sample[1]
+    if limit:
+        wrapped += f" LIMIT {int(limit)}"
+    return wrapped
+
+
+def statement_sql(statement, dialect="mysql"):
+    """A statement's "query" with its "columns", "limit" and "sample" pushed down."""
+    return sql_pushdown(statement["query"], statement.get("columns"), statement.get("limit"),
+                        sample_spec(statement), dialect)
+
+
+def mongo_pushdown(filter_query, columns=None, limit=None, sample=None):
+    """
+    Translates columns/limit/sample for Mongo. Returns ("find", filter,
+    options) or, for count samples, ("aggregate", pipeline, {}) using
+    $sample. Fractions become a $rand filter. Mongo has no seeded random,
+    so seeds are ignored.
+    """
+    options = {}
+    if columns:
+        options["projection"] = {column: 1 for column in columns}
+        if "_id" not in columns:
+            options["projection"]["_id"] = 0
+
+    if sample and sample[0] == "count":
+        size = min(int(limit), sample[1]) if limit else sample[1]
+        pipeline = [{"$match": filter_query or {}}, {"$sample": {"size": size}}]
+        if columns:
+            pipeline.append({"$project": options["projection"]})
+        return "aggregate", pipeline, {}
+
+    if sample and sample[0] == "fraction":
+        condition = {"$expr": {"$lt": [{"$rand": {}}, float(sample[1])]}}
+        filter_query = {"$and": [filter_query, condition]} if filter_query else condition
+    if limit:
+        options["limit"] = int(limit)
+    return "find", filter_query or {}, options
+
+
+SPLIT_MODES = ("range", "mod")
+DEFAULT_SPLITS = 4
+
+
+def split_spec(statement):
+    """
+    Normalizes a statement's partitioned extraction ("split_by", "splits",
+    "split_mode"). Returns (column, count, mode) or None. Splits cannot be
+    combined with a "limit" or a row-count "sample", which are global.
+    """
+    column = statement.get("split_by")
+    if not column:
+        return None
+    count = int(statement.get("splits", DEFAULT_SPLITS))
+    mode = statement.get("split_mode", "range")
+    if mode not in SPLIT_MODES:
+        raise ValueError(f"Invalid split_mode '{mode}': use one of {', '.join(SPLIT_MODES)}")
+    if count < 1:
+        raise ValueError("\"splits\" must be at least 1")
+    bounds = statement.get("split_bounds")
+    if bounds is not None and len(bounds) != 2:
+        raise ValueError("\"split_bounds\" must be [low, high]")
+    sample = sample_spec(statement)
+    if statement.get("limit") or (sample and sample[0] == "count"):
+        raise ValueError("\"split_by\" cannot be combined with \"limit\" or a row-count \"sample\"")
+    return column, count, mode
+
+
+def split_ranges(low, high, count):
+    """
+    Splits [low, high] into at most `count` contiguous (start, end) ranges,
+    the last one inclusive. Works for ints, floats, Decimals, dates and
+    datetimes; integer boundaries are deduplicated so no range is empty.
+    """
+    if low is None or high is None:
+        return []
+    if low == high or count == 1:
+        return [(low, high)]
+    try:
+        step = (high - low) / count
+        boundaries = [low + step * index for index in range(1, count)]
+    except TypeError:
+        raise ValueError(f"Range splits need numeric or date keys, got {type(low).__name__}; "
+                         f"use \"split_mode\": \"mod\"") from None
+    if isinstance(low, int) and isinstance(high, int):
+        boundaries = sorted({int(boundary) for boundary in boundaries if low < int(boundary) < high})
+    edges = [low, *boundaries, high]
+    return list(zip(edges, edges[1:]))
+
+
+def _sql_literal(value):
+    # Bounds come from MIN/MAX of the key (or the statement), never from user text.
+    if isinstance(value, bool):
+        raise ValueError("Boolean split keys are not supported")
+    if isinstance(value, (int, Decimal)):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (datetime, date)):
+        return f"'{value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()}'"
+    raise ValueError(f"Unsupported split bound {value!r}")
+
+
+def sql_bounds_query(query, column):
+    """SELECT MIN/MAX of the split column over `query`, for range splits."""
+    name = quote_sql_identifier(column)
+    return f"SELECT MIN({name}) AS low, MAX({name}) AS high FROM ({strip_sql(query)}) AS _chester_split"
+
+
+def sql_split_queries(query, column, mode, count, bounds=None, dialect="mysql"):
+    """
+    Splits `query` into sub-queries that partition its rows on `column`,
+    like Sqoop's split-by: key ranges between bounds (low, high), or
+    MOD(FLOOR(ABS(column)), count) buckets. No row is lost: the first and
+    last ranges are open ended, so keys outside the bounds still match,
+    fractional keys are floored so they land in a bucket, and rows with a
+    NULL key go to the first sub-query. Returns [query] when there is
+    nothing to split.
+    """
+    name = quote_sql_identifier(column)
+    base = f"SELECT * FROM ({strip_sql(query)}) AS _chester_split WHERE "
+    null = f" OR {name} IS NULL"
+
+    if mode == "mod":
+        # MOD keeps the fraction of non-integer keys (2.5 → 0.5), which would
+        # match no bucket; SQLite's % already truncates to an integer.
+        bucket = f"ABS({name}) % {int(count)}" if dialect == "sqlite" else f"MOD(FLOOR(ABS({name})), {int(count)})"
+        return [base + f"({bucket} = {index}{null if index == 0 else ''})" for index in range(count)]
+
+    boundaries = [end for _, end in split_ranges(*(bounds or (None, None)), count)[:-1]]
+    if not boundaries:
+        return [query]
+    queries = [base + f"({name} < {_sql_literal(boundaries[0])}{null})"]
+    for start, end in zip(boundaries, boundaries[1:]):
+        queries.append(base + f"({name} >= {_sql_literal(start)} AND {name} < {_sql_literal(end)})")
+    queries.append(base + f"({name} >= {_sql_literal(boundaries[-1])})")
+    return queries
+
+
+def mongo_split_filters(filter_query, key, mode, count, bounds=None):
+    """
+    Splits a Mongo filter into filters partitioning the documents on `key`:
+    key ranges between bounds (low, high) — ObjectIds are split by their
+    creation time — or $mod buckets of the floored absolute key. As in
+    sql_split_queries no document is lost: the outer ranges are open ended,
+    fractional keys are floored, and null or missing keys go to the first
+    filter.
+    """
+    if mode == "mod":
+        bucket = {"$mod": [{"$floor": {"$abs": f"${key}"}}, int(count)]}
+        parts = [{"$expr": {"$eq": [bucket, index]}} for index in range(count)]
+    else:
+        low, high = bounds or (None, None)
+        if type(low).__name__ == "ObjectId":
+            from bson import ObjectId
+            ranges = split_ranges(low.generation_time, high.generation_time, count)
+            boundaries = [ObjectId.from_datetime(end) for _, end in ranges[:-1]]
+        else:
+            boundaries = [end for _, end in split_ranges(low, high, count)[:-1]]
+        if not boundaries:
+            return [filter_query or {}]
+        parts = [{key: {"$lt": boundaries[0]}}]
+        parts += [{key: {"$gte": start, "$lt": end}} for start, end in zip(boundaries, boundaries[1:])]
+        parts.append({key: {"$gte": boundaries[-1]}})
+    parts[0] = {"$or": [parts[0], {key: None}]}
+    return [{"$and": [filter_query, part]} if filter_query else part for part in parts]
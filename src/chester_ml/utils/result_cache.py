@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from loguru import logger
+from chester_ml.utils.batch_spool import dump_batch, replay_batches
+from chester_ml.writers.encoding import json_default
+
+DEFAULT_CACHE_DIR = ".chester_cache"
+DEFAULT_MAX_MB = 1024
+INDEX_FILE = "index.json"
+
+# Statement keys that control caching or how a result is returned ("stream":
+# entries are stored as batches either way) but do not change the result.
+CONTROL_KEYS = {"cache", "cache_ttl", "timeout", "stream"}
+
+
+class ResultCache:
+    """
+    On-disk cache of statement results.
+
+    Each entry is a file of pickled row batches, so cached results replay as a
+    stream with their original Python types (Decimal, datetime, ObjectId...).
+    An index tracks size and last access; entries past their TTL are ignored
+    and the least recently used ones are evicted beyond `max_bytes`.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.getenv("CHESTER_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or float(os.getenv("CHESTER_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache index unreadable, starting empty: {e}")
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(self.index, file)
+        os.replace(path + ".tmp", path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    @staticmethod
+    def key_for(provider, statement, fingerprint=None):
+        """Hash of the provider, the statement definition and the source fingerprint."""
+        definition = {k: v for k, v in statement.items() if k not in CONTROL_KEYS}
+        payload = json.dumps(
+            {"provider": provider, "statement": definition, "fingerprint": fingerprint},
+            sort_keys=True,
+            default=json_default
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns an iterator over the cached batches, or None on a miss."""
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            path = self._entry_path(key)
+            expired = entry.get("ttl") and time.time() - entry["created"] > entry["ttl"]
+            if expired or not os.path.exists(path):
+                self._remove(key)
+                self._save_index()
+                return None
+            entry["last_access"] = time.time()
+            self._save_index()
+        return replay_batches(path)
+
+    def store(self, key, batches, ttl=None, label=None):
+        """
+        Passes `batches` through while spooling them to the cache. The entry
+        is only committed once the stream has been fully consumed.
+        """
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        rows = 0
+        committed = False
+        try:
+            with open(tmp_path, "wb") as file:
+                for batch in batches:
+                    dump_batch(file, batch)
+                    rows += len(batch)
+                    yield batch
+            os.replace(tmp_path, path)
+            committed = True
+        finally:
+            if not committed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        now = time.time()
+        with self.lock:
+            self.index[key] = {
+                "label": label,
+                "rows": rows,
+                "size": os.path.getsize(path),
+                "created": now,
+                "last_access": now,
+                "ttl": ttl
+            }
+            self._evict()
+            self._save_index()
+        logger.debug(f"💽 Cached {rows} rows for {label} ({key[:12]}).")
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]["size"]
+            logger.debug(f"🧹 Evicting cached result {self.index[key].get('label')} ({key[:12]}).")
+            self._remove(key)
+
+    def _remove(self, key):
+        self.index.pop(key, None)
+        path = self._entry_path(key)
+        if os.path.exists(path):
+            os.remove(path)
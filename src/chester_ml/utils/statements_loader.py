@@ -1,32 +1,36 @@
-import json
-import os
 from loguru import logger
+from chester_ml.utils.catalog import CatalogError, load_catalog
 
 class StatementsLoader:
     def __init__(self, universe_dir="universes"):
         self.universe_dir = universe_dir
         self.remote_statements = {}
         self.local_statements = {}
+        self.training = {}
+        self.catalog = None
 
     def load_statements(self):
-        """Carga los archivos de configuración de negocio."""
+        """
+        Carga el catálogo de statements del universo: *remote*.json,
+        *local*.json y *train*.json (configuraciones de `chester train`).
+        El catálogo se valida antes de ejecutar nada y se recompila solo
+        cuando cambia algún archivo (ver utils/catalog.py); si no valida,
+        se registran todos los problemas y se lanza CatalogError.
+        """
         try:
-            for file in os.listdir(self.universe_dir):
-                path = os.path.join(self.universe_dir, file)
-                if not file.endswith(".json"):
-                    continue
-
-                with open(path, "r", encoding="utf-8") as f:
-                    content = json.load(f)
-
-                if "remote" in file.lower():
-                    self.remote_statements.update(content)
-                elif "loca" in file.lower():
-                    self.local_statements.update(content)
-
-            logger.info("✅ Business configurations (remote/local) loaded successfully.")
+            self.catalog = load_catalog(self.universe_dir)
+        except CatalogError as e:
+            for problem in e.problems:
+                logger.error(f"❌ {problem}")
+            raise
         except Exception as e:
             logger.error(f"❌ Failed to load business configurations: {e}")
+            return
+
+        self.remote_statements = self.catalog.remote
+        self.local_statements = self.catalog.local
+        self.training = self.catalog.training
+        logger.info("✅ Business configurations (remote/local) loaded successfully.")
 
     def get_statement(self, context, provider_type, key):
         """
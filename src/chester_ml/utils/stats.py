@@ -0,0 +1,27 @@
+import math
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile() of an empty sequence")
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values, digits=6):
+    """min/mean/p50/p90/p99/max of a sample, rounded for reports."""
+    values = list(values)
+    if not values:
+        return {}
+    summary = {
+        "min": min(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values)
+    }
+    return {key: round(value, digits) for key, value in summary.items()}
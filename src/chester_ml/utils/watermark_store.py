@@ -0,0 +1,90 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from loguru import logger
+
+DEFAULT_STATE_DIR = ".chester_state"
+WATERMARKS_FILE = "watermarks.json"
+
+
+def encode_watermark(value):
+    """Serializes a watermark keeping its type (datetime, Decimal, ObjectId...)."""
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if type(value).__name__ == "ObjectId":
+        return {"$oid": str(value)}
+    return value
+
+
+def decode_watermark(value):
+    if not isinstance(value, dict):
+        return value
+    if "$datetime" in value:
+        return datetime.fromisoformat(value["$datetime"])
+    if "$date" in value:
+        return date.fromisoformat(value["$date"])
+    if "$decimal" in value:
+        return Decimal(value["$decimal"])
+    if "$oid" in value:
+        from bson import ObjectId
+        return ObjectId(value["$oid"])
+    return value
+
+
+class WatermarkStore:
+    """
+    Local state for incremental statements: the last high-water mark per
+    statement (watermarks.json) and the rows extracted so far, kept as a
+    file of pickled batches per statement so each run can merge its delta
+    with the previous output.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.getenv("CHESTER_STATE_DIR", DEFAULT_STATE_DIR)
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(self.directory, "data"), exist_ok=True)
+
+    def _watermarks_path(self):
+        return os.path.join(self.directory, WATERMARKS_FILE)
+
+    def _load(self):
+        try:
+            with open(self._watermarks_path(), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, label, column):
+        """Returns the stored watermark for `label`, or None if absent or for another column."""
+        with self.lock:
+            state = self._load().get(label)
+        if not state or state.get("column") != column:
+            return None
+        return decode_watermark(state["value"])
+
+    def set(self, label, column, value, rows):
+        with self.lock:
+            watermarks = self._load()
+            watermarks[label] = {
+                "column": column,
+                "value": encode_watermark(value),
+                "rows": rows,
+                "updated": time.time()
+            }
+            path = self._watermarks_path()
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(watermarks, file, indent=4)
+            os.replace(path + ".tmp", path)
+        logger.debug(f"🌊 Watermark for {label} set to {value!r}.")
+
+    def data_path(self, label):
+        """Path of the accumulated rows for `label`."""
+        return os.path.join(self.directory, "data", re.sub(r"[^\w.-]", "_", label) + ".pkl")
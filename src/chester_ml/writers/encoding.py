@@ -0,0 +1,65 @@
+import base64
+import gzip
+import json
+import lzma
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "lzma": ".xz"
+}
+
+
+def json_default(value):
+    """
+    Converts values the json module cannot encode natively: datetimes and
+    Decimals from SQL, ObjectId/Decimal128/Binary from Mongo, and a few
+    common Python types. Decimals become strings, since a float would
+    silently round them (e.g. DECIMAL(38, 10) money columns). Unknown types
+    fall back to str().
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "to_decimal"):  # bson.Decimal128
+        return str(value.to_decimal())
+    return str(value)  # bson.ObjectId, Timestamp, and anything else
+
+
+_encoder = json.JSONEncoder(
+    default=json_default,
+    ensure_ascii=False,
+    check_circular=False,
+    separators=(",", ":")
+)
+
+# Compact single-line encoding backed by the C accelerator.
+encode = _encoder.encode
+
+
+def open_output(path, compression=None):
+    """Opens `path` for text writing, optionally through gzip or lzma."""
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    if compression == "lzma":
+        return lzma.open(path, "wt", encoding="utf-8")
+    if compression:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return open(path, "w", encoding="utf-8")
+
+
+def with_suffix(path, compression=None):
+    """Appends the compression suffix (.gz/.xz) to `path` if missing."""
+    suffix = COMPRESSION_SUFFIXES.get(compression, "")
+    return path if path.endswith(suffix) else path + suffix
@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from loguru import logger
+from chester_ml.interfaces.writer_interface import WriterInterface
+from chester_ml.utils.metrics import span
+from chester_ml.writers.encoding import encode, open_output, with_suffix
+
+
+class JSONWriter(WriterInterface):
+    """
+    Writes results into a single JSON document shaped as
+    {provider: {statement: [rows...]}}.
+
+    Each statement is streamed into its own temporary segment, so statements
+    can be written concurrently from worker threads and streamed results never
+    need to be held in memory; close() stitches the segments together.
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = with_suffix(path, compression)
+        self.compression = compression
+        self.segment_dir = tempfile.mkdtemp(prefix="chester_json_")
+        self.segments = {}
+        self.segment_count = 0
+        self.lock = threading.Lock()
+        # Fail fast on an unwritable output path rather than at close().
+        open(self.path, "w").close()
+
+    def write_statement(self, provider, name, batches):
+        """
+        Writes every row of `batches` (an iterable of row lists) under
+        provider/name and returns the number of rows written.
+        """
+        with self.lock:
+            segment = os.path.join(self.segment_dir, f"{self.segment_count}.part")
+            self.segment_count += 1
+            self.segments.setdefault(provider, {})[name] = segment
+
+        rows = 0
+        with open(segment, "w", encoding="utf-8") as file:
+            for batch in batches:
+                if not batch:
+                    continue
+                with span("serialize"):
+                    text = ",\n            ".join(map(encode, batch))
+                file.write(",\n            " if rows else "\n            ")
+                file.write(text)
+                rows += len(batch)
+        return rows
+
+    def discard(self, provider, name):
+        """Drops a statement (e.g. one abandoned after a timeout) from the output."""
+        with self.lock:
+            self.segments.get(provider, {}).pop(name, None)
+
+    def close(self):
+        try:
+            with open_output(self.path, self.compression) as out:
+                out.write("{")
+                for p_index, (provider, statements) in enumerate(self.segments.items()):
+                    out.write(f"{',' if p_index else ''}\n    {json.dumps(provider)}: {{")
+                    for s_index, (name, segment) in enumerate(statements.items()):
+                        out.write(f"{',' if s_index else ''}\n        {json.dumps(name)}: [")
+                        if os.path.exists(segment) and os.path.getsize(segment):
+                            with open(segment, "r", encoding="utf-8") as part:
+                                shutil.copyfileobj(part, out)
+                            out.write("\n        ]")
+                        else:
+                            out.write("]")
+                    out.write("\n    }")
+                out.write("\n}\n")
+        finally:
+            shutil.rmtree(self.segment_dir, ignore_errors=True)
+        logger.debug(f"🧾 JSON writer closed: {self.path}")
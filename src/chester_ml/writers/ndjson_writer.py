@@ -0,0 +1,52 @@
+import os
+import re
+from loguru import logger
+from chester_ml.interfaces.writer_interface import WriterInterface
+from chester_ml.utils.metrics import span
+from chester_ml.writers.encoding import encode, open_output, with_suffix
+
+
+class NDJSONWriter(WriterInterface):
+    """
+    Writes one JSON Lines file per statement under `directory`:
+    <directory>/<PROVIDER>/<statement>.ndjson[.gz|.xz].
+
+    Rows are encoded and written batch by batch, so memory use is bounded by
+    the incoming batch size regardless of the extraction size.
+    """
+
+    def __init__(self, directory, compression=None):
+        self.directory = directory
+        self.compression = compression
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, provider, name):
+        safe_name = re.sub(r"[^\w.-]", "_", name)
+        return with_suffix(os.path.join(self.directory, provider, f"{safe_name}.ndjson"), self.compression)
+
+    def write_statement(self, provider, name, batches):
+        path = self._path(provider, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        rows = 0
+        with open_output(path, self.compression) as file:
+            for batch in batches:
+                if batch:
+                    with span("serialize"):
+                        text = "\n".join(map(encode, batch))
+                    file.write(text)
+                    file.write("\n")
+                    rows += len(batch)
+        logger.debug(f"🧾 {rows} rows written to {path}")
+        return rows
+
+    def discard(self, provider, name):
+        path = self._path(provider, name)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove discarded output {path}: {e}")
+
+    def close(self):
+        logger.debug(f"🧾 NDJSON writer closed: {self.directory}")
@@ -0,0 +1,190 @@
+import json
+import os
+import re
+import shutil
+import numpy as np
+from loguru import logger
+from chester_ml.interfaces.writer_interface import WriterInterface
+from chester_ml.utils.metrics import span
+from chester_ml.utils.columnar import KIND_DTYPES, Categories, convert, to_categories, values_kind
+
+SCHEMA_FILE = "schema.json"
+COPY_CHUNK_ROWS = 1_000_000
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]", "_", str(name))
+
+
+class _ColumnSink:
+    """Appends one column's typed values to a raw spool file, batch by batch."""
+
+    def __init__(self, directory, name, file_stem, rows_before):
+        self.name = name
+        self.file_stem = file_stem
+        self.raw_path = os.path.join(directory, f"{file_stem}.raw")
+        self.valid_path = os.path.join(directory, f"{file_stem}.valid.raw")
+        self.kind = None
+        self.categories = Categories()
+        self.has_nulls = False
+        # Rows seen before this column first appeared are nulls.
+        self.pending_nulls = rows_before
+        self.rows = 0
+
+    def append(self, values):
+        kind = values_kind(values, self.kind)
+        if kind is None:
+            self.pending_nulls += len(values)
+            return
+        if self.kind is None:
+            self.kind = kind
+            self._append_nulls(self.pending_nulls)
+            self.pending_nulls = 0
+        elif kind != self.kind:
+            self._widen(kind)
+
+        array, valid = convert(self.kind, values, self.categories)
+        self._write(array, valid)
+
+    def _append_nulls(self, count):
+        if count:
+            self._write(*convert(self.kind, [None] * count, self.categories))
+
+    def _write(self, array, valid):
+        with open(self.raw_path, "ab") as raw:
+            array.tofile(raw)
+        with open(self.valid_path, "ab") as raw:
+            valid.tofile(raw)
+        self.has_nulls = self.has_nulls or not valid.all()
+        self.rows += len(array)
+
+    def _widen(self, kind):
+        """
+        Rewrites the spooled values when e.g. an int column meets a float,
+        or as category codes when it meets a value of an incompatible kind.
+        """
+        logger.debug(f"🔁 Widening column '{self.name}' from {self.kind} to {kind}.")
+        old = np.fromfile(self.raw_path, dtype=KIND_DTYPES[self.kind])
+        if kind == "category":
+            valid = np.fromfile(self.valid_path, dtype=KIND_DTYPES["bool"])
+            to_categories(old, valid, self.categories).tofile(self.raw_path)
+        else:
+            old.astype(KIND_DTYPES[kind]).tofile(self.raw_path)
+        self.kind = kind
+
+    def finalize(self, directory, total_rows):
+        if self.kind is None:
+            self.kind = "float"  # every value was null
+        self._append_nulls(total_rows - self.rows)
+
+        column = {
+            "kind": self.kind,
+            "dtype": KIND_DTYPES[self.kind].str,
+            "file": f"{self.file_stem}.npy"
+        }
+        _spool_to_npy(self.raw_path, os.path.join(directory, column["file"]), KIND_DTYPES[self.kind], total_rows)
+
+        if self.has_nulls:
+            column["valid"] = f"{self.file_stem}.valid.npy"
+            _spool_to_npy(self.valid_path, os.path.join(directory, column["valid"]), KIND_DTYPES["bool"], total_rows)
+        elif os.path.exists(self.valid_path):
+            os.remove(self.valid_path)
+
+        if self.kind == "category":
+            column["categories"] = f"{self.file_stem}.categories.npy"
+            np.save(os.path.join(directory, column["categories"]), self.categories.to_numpy())
+
+        return column
+
+
+def _spool_to_npy(raw_path, npy_path, dtype, rows):
+    """Copies a raw spool file into a .npy file in bounded-size chunks."""
+    target = np.lib.format.open_memmap(npy_path, mode="w+", dtype=dtype, shape=(rows,))
+    if rows and os.path.exists(raw_path):
+        source = np.memmap(raw_path, dtype=dtype, mode="r", shape=(rows,))
+        for start in range(0, rows, COPY_CHUNK_ROWS):
+            target[start:start + COPY_CHUNK_ROWS] = source[start:start + COPY_CHUNK_ROWS]
+        del source
+    target.flush()
+    del target
+    if os.path.exists(raw_path):
+        os.remove(raw_path)
+
+
+class NumpyWriter(WriterInterface):
+    """
+    Writes each statement as a directory of typed NumPy column files:
+    <directory>/<PROVIDER>/<statement>/<column>.npy plus schema.json.
+
+    String-like columns are dictionary-encoded (int32 codes plus a
+    .categories.npy array) and columns with nulls get a .valid.npy mask, so
+    every file can be opened with np.load(..., mmap_mode="r") without copies.
+    """
+
+    def __init__(self, directory, compression=None):
+        self.directory = directory
+        if compression:
+            logger.warning("⚠️ Compression is ignored for the npy format (files must stay memory-mappable).")
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, provider, name):
+        return os.path.join(self.directory, provider, _safe_name(name))
+
+    def write_statement(self, provider, name, batches):
+        path = self._path(provider, name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+        columns = {}
+        stems = set()
+        rows = 0
+        for batch in batches:
+            if not batch:
+                continue
+            batch = [row if isinstance(row, dict) else {"value": row} for row in batch]
+            for row in batch:
+                for key in row:
+                    if key not in columns:
+                        stem = re.sub(r"[^\w-]", "_", str(key))
+                        while stem in stems:
+                            stem += "_"
+                        stems.add(stem)
+                        columns[key] = _ColumnSink(path, key, stem, rows)
+            with span("serialize"):
+                for key, sink in columns.items():
+                    sink.append([row.get(key) for row in batch])
+            rows += len(batch)
+
+        schema = {
+            "rows": rows,
+            "columns": {str(key): sink.finalize(path, rows) for key, sink in columns.items()}
+        }
+        with open(os.path.join(path, SCHEMA_FILE), "w", encoding="utf-8") as file:
+            json.dump(schema, file, indent=4)
+
+        logger.debug(f"🧾 {rows} rows x {len(columns)} columns written to {path}")
+        return rows
+
+    def discard(self, provider, name):
+        shutil.rmtree(self._path(provider, name), ignore_errors=True)
+
+    def close(self):
+        logger.debug(f"🧾 NumPy writer closed: {self.directory}")
+
+
+def load_columns(path, mmap_mode="r"):
+    """
+    Loads a statement written by NumpyWriter as {column: array}.
+    Category columns are returned as their int32 codes; use load_schema()
+    and the .categories.npy files to map codes back to strings.
+    """
+    schema = load_schema(path)
+    return {
+        name: np.load(os.path.join(path, column["file"]), mmap_mode=mmap_mode)
+        for name, column in schema["columns"].items()
+    }
+
+
+def load_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), "r", encoding="utf-8") as file:
+        return json.load(file)
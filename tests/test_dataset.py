@@ -0,0 +1,25 @@
+import numpy as np
+from chester_ml.utils.dataset import Dataset
+
+
+def test_int_column_widens_to_category_on_string():
+    dataset = Dataset.from_batches([
+        [{"code": 1}, {"code": None}, {"code": 2}],
+        [{"code": "A3"}]
+    ])
+
+    assert dataset.schema == {"code": "category"}
+    values, valid = dataset.column("code")
+    assert valid.tolist() == [True, False, True, True]
+    labels = dataset.categories("code")
+    assert [labels[code] for code in values[valid]] == ["1", "2", "A3"]
+    assert [row["code"] for batch in dataset.iter_batches() for row in batch] == ["1", None, "2", "A3"]
+
+
+def test_int_column_still_widens_to_float():
+    dataset = Dataset.from_batches([[{"x": 1}], [{"x": 2.5}]])
+
+    assert dataset.schema == {"x": "float"}
+    values, valid = dataset.column("x")
+    assert valid is None
+    assert np.array_equal(values, [1.0, 2.5])